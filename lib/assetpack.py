@@ -0,0 +1,95 @@
+# assetpack.py Indexed pack of image assets in a single file.
+#
+# Opening one pack replaces an open() and directory lookup per icon with a
+# seek. Layout, all integers little-endian:
+#
+#   header   magic b"APAK", u16 version, u16 entry count
+#   index    per entry: u32 offset, u32 size, u16 width, u16 height,
+#            u8 format, u8 name length, name (UTF-8)
+#   payloads each starting on an _ALIGN byte boundary
+#
+# Payload formats:
+#   FMT_RGB565  big-endian RGB565 rows, as in .raw files
+#   FMT_RLE565  an RLE565 image (see rle565.py)
+#
+# Packs are built on the host with tools/packassets.py.
+#
+# icons = AssetPack("icons.pak")
+# icons.blit(lcd, "setting", 0, 0, clip=(0, 0, 80, 80))
+
+import struct
+
+try:
+    from micropython import const
+except ImportError:  # CPython host, for the packer
+    def const(x):
+        return x
+
+MAGIC = b"APAK"
+VERSION = const(1)
+HEADER = "<4sHH"
+ENTRY = "<IIHHBB"
+ALIGN = const(4)
+
+FMT_RGB565 = const(0)
+FMT_RLE565 = const(1)
+
+
+class AssetPack:
+    def __init__(self, filename):
+        self._f = f = open(filename, "rb")
+        magic, version, count = struct.unpack(HEADER, f.read(struct.calcsize(HEADER)))
+        if magic != MAGIC or version != VERSION:
+            f.close()
+            raise ValueError("Not an asset pack")
+        size = struct.calcsize(ENTRY)
+        # name -> (offset, size, width, height, format)
+        self._index = index = {}
+        for _ in range(count):
+            offset, nbytes, w, h, fmt, n = struct.unpack(ENTRY, f.read(size))
+            index[f.read(n).decode()] = (offset, nbytes, w, h, fmt)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def names(self):
+        return self._index.keys()
+
+    def info(self, name):
+        """Return (width, height, format) of an asset."""
+        e = self._index[name]
+        return e[2], e[3], e[4]
+
+    def open(self, name):
+        """Seek to the payload of name.
+
+        Returns the pack's file and the payload's (offset, size, width,
+        height, format) for readers that stream it themselves.
+        """
+        e = self._index[name]
+        self._f.seek(e[0])
+        return self._f, e
+
+    def readinto(self, name, buf, pos=0):
+        """Read payload bytes of name from pos into buf; returns the count."""
+        offset, nbytes, _, _, _ = self._index[name]
+        n = min(len(buf), nbytes - pos)
+        if n <= 0:
+            return 0
+        self._f.seek(offset + pos)
+        if n < len(buf):
+            buf = memoryview(buf)[:n]
+        return self._f.readinto(buf)
+
+    def blit(self, display, name, x, y, clip=None, direct=False):
+        """Draw name on an LCD_1inch3 at (x, y), see LCD_1inch3.blit_raw()."""
+        offset, _, w, h, fmt = self._index[name]
+        if fmt == FMT_RGB565:
+            display.blit_raw(self._f, x, y, w, h, clip, offset, direct)
+        elif fmt == FMT_RLE565:
+            display.blit_rle565(self._f, x, y, offset, clip, direct)
+        else:
+            raise ValueError("Unsupported asset format")
+
+    def close(self):
+        self._f.close()
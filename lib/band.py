@@ -0,0 +1,115 @@
+# band.py Banded rendering for low-RAM full-screen drawing.
+#
+# Draw calls are recorded into a display list instead of being executed.
+# render() then replays the list once per band into a strip buffer of an
+# LCD_1inch3 created with lines=N, sending each finished band before the
+# next is drawn. Operations that do not touch a band are skipped.
+#
+# Each band starts out filled with the background color, unless the list
+# begins with a full-screen fill(), so pixels no operation draws are never
+# left over from the previous band.
+#
+# RAM is 480 bytes per line per buffer, so band height trades memory for
+# speed (fewer replays and window setups):
+#   lines=8,  buffers=1   3.8 KB
+#   lines=16, buffers=1   7.7 KB
+#   lines=16, buffers=2  15.4 KB  (next band is drawn while one is sent)
+#
+# lcd = LCD_1inch3(buffers=2, lines=16)
+# scene = BandRenderer(lcd)
+# scene.fill(lcd.white)
+# scene.text("Hello", 10, 10, lcd.blue)
+# scene.render()
+
+import os
+
+
+class BandRenderer:
+    def __init__(self, display, background=0):
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        self.background = background
+        # Entries are (first row, row after last, bound method, args)
+        self._ops = []
+        self._filled = False  # The list starts with a full-screen fill
+        self._files = {}  # Images opened during render(), by file name
+
+    def clear(self):
+        """Drop the recorded display list."""
+        self._ops = []
+        self._filled = False
+
+    def _add(self, y0, y1, fn, args):
+        if y1 > 0 and y0 < self.height:
+            self._ops.append((y0, y1, fn, args))
+
+    def fill(self, color):
+        self._ops = []  # Everything before is painted over
+        self._filled = True
+        self._add(0, self.height, self.display.fill, (color,))
+
+    def fill_rect(self, x, y, w, h, color):
+        self._add(y, y + h, self.display.fill_rect, (x, y, w, h, color))
+
+    def rect(self, x, y, w, h, color, f=False):
+        self._add(y, y + h, self.display.rect, (x, y, w, h, color, f))
+
+    def hline(self, x, y, w, color):
+        self._add(y, y + 1, self.display.hline, (x, y, w, color))
+
+    def vline(self, x, y, h, color):
+        self._add(y, y + h, self.display.vline, (x, y, h, color))
+
+    def line(self, x1, y1, x2, y2, color):
+        self._add(min(y1, y2), max(y1, y2) + 1, self.display.line, (x1, y1, x2, y2, color))
+
+    def text(self, s, x, y, color=1):
+        self._add(y, y + 8, self.display.text, (s, x, y, color))
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            h = fbuf[2]
+        else:
+            h = getattr(fbuf, "height", self.height)
+        self._add(y, y + h, self.display.blit, (fbuf, x, y, key, palette))
+
+    def image(self, filename, x=0, y=0, w=None, h=None, clip=None):
+        """Record an RGB565 .raw file, read from flash in each band it covers.
+
+        Without w the image is taken to be square; without h it is worked
+        out from the file size. clip is as for LCD_1inch3.blit_raw().
+        """
+        size = os.stat(filename)[6] // 2
+        if w is None:
+            w = int(size ** 0.5)
+        if h is None:
+            h = size // w
+        self._add(y, y + h, self._raw, (filename, x, y, w, h, clip))
+
+    def _raw(self, filename, x, y, w, h, clip):
+        # Files stay open until render() is done with every band
+        f = self._files.get(filename)
+        if f is None:
+            f = self._files[filename] = open(filename, "rb")
+        self.display.blit_raw(f, x, y, w, h, clip)
+
+    def render(self):
+        """Replay the display list band by band and send every band."""
+        display = self.display
+        ops = self._ops
+        lines = display.lines
+        try:
+            for top in display.bands():
+                bottom = top + lines
+                if not self._filled:
+                    display.fill(self.background)
+                for y0, y1, fn, args in ops:
+                    if y0 < bottom and y1 > top:
+                        fn(*args)
+                display.flip()
+            display.wait_flush()
+        finally:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
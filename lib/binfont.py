@@ -0,0 +1,87 @@
+# binfont.py Fonts held as one bytes blob plus an offset index.
+#
+# The layout is the one font-to-py emits: each glyph is a little-endian u16
+# width followed by its rows, MSB first and padded to whole bytes, and the
+# index holds a little-endian (start, end) u16 pair per character from
+# first to last. Several characters may share one glyph, so a font can map
+# lower case onto upper case at no cost.
+#
+# Anti-aliased fonts store 2 or 4 bits of coverage per pixel, packed the way
+# framebuf's GS2_HMSB and GS4_HMSB modes read them, and are drawn through a
+# blend table (see blend.py). bpp() tells them apart from 1-bit fonts.
+#
+# widths may give per-char advance and ink width tables (bytes, first to
+# last), which spare Writer from reading every glyph to build its own.
+#
+# Kept in a frozen module the blob stays in flash and glyphs are returned
+# as memoryview slices of it, so a font costs no heap beyond the object.
+#
+# from binfont import BinFont
+# font = BinFont(_font, _index, 8, 8, first=32, last=126)
+# Writer(lcd, font)
+
+from micropython import const
+
+_GLYPH = const(2)  # Bytes of width before each glyph's rows
+
+
+class BinFont:
+    def __init__(self, data, index, height, max_width, first=32, last=126,
+                 default=None, monospaced=False, bpp=1, widths=None):
+        self._data = memoryview(data)
+        self._index = memoryview(index)
+        self._height = height
+        self._max_width = max_width
+        self._first = first
+        self._last = last
+        self._monospaced = monospaced
+        self._bpp = bpp
+        self._widths = widths
+        # Characters outside first..last are drawn as default
+        if default is None:
+            default = first
+        self._default = default
+
+    # font-to-py interface, as used by Writer and ST7789.text()
+
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._max_width
+
+    def hmap(self):
+        return True
+
+    def reverse(self):
+        return False
+
+    def monospaced(self):
+        return self._monospaced
+
+    def min_ch(self):
+        return self._first
+
+    def max_ch(self):
+        return self._last
+
+    def bpp(self):
+        return self._bpp
+
+    def widths(self):
+        """Return (first, advances, ink widths), or None if not supplied."""
+        if self._widths is None:
+            return None
+        return (self._first,) + tuple(self._widths)
+
+    def get_ch(self, ch):
+        """Return (glyph rows, height, width) for ch."""
+        n = ord(ch)
+        if n < self._first or n > self._last:
+            n = self._default
+        i = (n - self._first) << 2
+        idx = self._index
+        start = idx[i] | idx[i + 1] << 8
+        end = idx[i + 2] | idx[i + 3] << 8
+        data = self._data
+        return data[start + _GLYPH:end], self._height, data[start] | data[start + 1] << 8
@@ -0,0 +1,62 @@
+# blend.py Blend tables for anti-aliased glyphs.
+#
+# A 2- or 4-bit glyph holds a coverage level per pixel. table() returns a
+# palette FrameBuffer holding the color of every level between bg and fg,
+# so FrameBuffer.blit(glyph, x, y, -1, table) blends each pixel with one
+# lookup done in C. Tables for the most recently used (fg, bg) pairs are
+# kept, so printing in a few colors builds each table once.
+#
+# fb.blit(glyph, x, y, -1, blend.table(fg, bg, 16))
+
+import framebuf
+from micropython import const
+
+_SLOTS = const(4)  # Tables kept, most recent first
+
+_tables = []
+
+
+def _swap(c):
+    return (c & 0xFF) << 8 | c >> 8
+
+
+def mix(fg, bg, level, levels):
+    """RGB565 color level/(levels - 1) of the way from bg to fg."""
+    top = levels - 1
+    r0 = bg >> 11
+    g0 = bg >> 5 & 0x3F
+    b0 = bg & 0x1F
+    r = r0 + ((fg >> 11) - r0) * level // top
+    g = g0 + ((fg >> 5 & 0x3F) - g0) * level // top
+    b = b0 + ((fg & 0x1F) - b0) * level // top
+    return r << 11 | g << 5 | b
+
+
+def table(fg, bg, levels, swapped=False, mode=framebuf.RGB565):
+    """Palette mapping levels 0..levels-1 to colors from bg to fg.
+
+    fg and bg are RGB565; with swapped they are given and stored in panel
+    byte order, as LCD_1inch3 colors are. In an indexed mode fg and bg are
+    palette indices, which cannot be blended: levels from half up map to fg.
+    """
+    key = (fg, bg, levels, swapped, mode)
+    for i, entry in enumerate(_tables):
+        if entry[0] == key:
+            if i:
+                _tables.insert(0, _tables.pop(i))
+            return entry[1]
+    pal = framebuf.FrameBuffer(bytearray(2 * levels), levels, 1, mode)
+    if mode == framebuf.RGB565:
+        if swapped:
+            fg = _swap(fg)
+            bg = _swap(bg)
+        for i in range(levels):
+            c = mix(fg, bg, i, levels)
+            pal.pixel(i, 0, _swap(c) if swapped else c)
+    else:
+        half = levels >> 1
+        for i in range(levels):
+            pal.pixel(i, 0, fg if i >= half else bg)
+    _tables.insert(0, (key, pal))
+    del _tables[_SLOTS:]
+    return pal
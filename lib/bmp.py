@@ -0,0 +1,163 @@
+# bmp.py Streaming BMP reader.
+#
+# Uncompressed 16 (RGB555 or RGB565 bit fields), 24 and 32 bpp files of any
+# size, stored bottom-up or top-down. Rows are read in file order a band at
+# a time with one readinto, converted to big-endian RGB565 by a viper kernel
+# and sent as one window (or one blit) per band, so RAM use is a fixed
+# budget rather than the image size.
+#
+# with open("image.bmp", "rb") as f:
+#     BMP(f).draw(lcd, 0, 0)
+
+import framebuf
+import micropython
+import struct
+from micropython import const
+
+_BAND_BUDGET = const(4096)  # Bytes for the raw and converted rows of a band
+_BI_RGB = const(0)
+_BI_BITFIELDS = const(3)
+
+
+# Row kernels: n pixels from src to big-endian RGB565 in dst
+@micropython.viper
+def _bgr24(src: ptr8, dst: ptr8, n: int):
+    i = 0
+    o = 0
+    while n > 0:
+        g = src[i + 1]
+        dst[o] = (src[i + 2] & 0xF8) | (g >> 5)
+        dst[o + 1] = ((g << 3) & 0xE0) | (src[i] >> 3)
+        i += 3
+        o += 2
+        n -= 1
+
+
+@micropython.viper
+def _bgr32(src: ptr8, dst: ptr8, n: int):
+    i = 0
+    o = 0
+    while n > 0:
+        g = src[i + 1]
+        dst[o] = (src[i + 2] & 0xF8) | (g >> 5)
+        dst[o + 1] = ((g << 3) & 0xE0) | (src[i] >> 3)
+        i += 4
+        o += 2
+        n -= 1
+
+
+@micropython.viper
+def _rgb555(src: ptr8, dst: ptr8, n: int):
+    # Little-endian X1R5G5B5; green is widened to 6 bits
+    o = 0
+    while n > 0:
+        v = src[o] | (src[o + 1] << 8)
+        g = (v >> 4) & 0x3E | (v >> 9) & 1
+        dst[o] = ((v >> 7) & 0xF8) | (g >> 3)
+        dst[o + 1] = ((g << 5) & 0xE0) | (v & 0x1F)
+        o += 2
+        n -= 1
+
+
+@micropython.viper
+def _rgb565(src: ptr8, dst: ptr8, n: int):
+    # Little-endian RGB565: swap the bytes
+    o = 0
+    while n > 0:
+        dst[o] = src[o + 1]
+        dst[o + 1] = src[o]
+        o += 2
+        n -= 1
+
+
+class BMP:
+    def __init__(self, f):
+        hdr = f.read(54)  # File header and BITMAPINFOHEADER
+        if hdr[0:2] != b"BM":
+            raise ValueError("Not a BMP file")
+        self._f = f
+        self._offset = struct.unpack_from("<I", hdr, 10)[0]
+        w, h, _, bpp, comp = struct.unpack_from("<iiHHI", hdr, 18)
+        if comp != _BI_RGB and comp != _BI_BITFIELDS:
+            raise ValueError("Compressed BMP files are not supported")
+        self.width = w
+        self.height = abs(h)
+        self.top_down = h < 0
+        self.bpp = bpp
+        if bpp == 24:
+            self._convert = _bgr24
+        elif bpp == 32:
+            self._convert = _bgr32
+        elif bpp == 16:
+            self._convert = _rgb555
+            if comp == _BI_BITFIELDS:
+                f.seek(54)  # Masks follow the 40-byte header
+                if struct.unpack("<III", f.read(12))[1] == 0x07E0:
+                    self._convert = _rgb565
+        else:
+            raise ValueError("Unsupported BMP depth")
+        self.row_bytes = (w * bpp + 31) // 32 * 4  # Rows pad to 4 bytes
+
+    def readrow(self, y, dst):
+        """Convert image row y (0 is the top) into dst as big-endian RGB565."""
+        f = self._f
+        rb = self.row_bytes
+        f.seek(self._offset + (y if self.top_down else self.height - 1 - y) * rb)
+        src = bytearray(rb)
+        f.readinto(src)
+        self._convert(src, dst, self.width)
+
+    def draw(self, display, x=0, y=0, direct=False, budget=_BAND_BUDGET):
+        """Draw the image with its top left corner at (x, y), clipped to the screen.
+
+        Bands go through display.blit(), so LCD_1inch3 records them as dirty
+        and handles its own bands. With direct=True, or on drivers without
+        blit() such as ST77xx, each band is written straight into a panel
+        window instead.
+        """
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + self.width, display.width)
+        y1 = min(y + self.height, display.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        n = x1 - x0
+        skip = (x0 - x) * (self.bpp // 8)
+        rb = self.row_bytes
+        k = min(max(1, budget // (rb + n * 2)), y1 - y0)
+        src = memoryview(bytearray(k * rb))
+        dst = memoryview(bytearray(k * n * 2))
+        direct = direct or not hasattr(display, "blit")
+        if direct:
+            bus = display.bus
+            xs = getattr(display, "xstart", 0)
+            ys = getattr(display, "ystart", 0)
+        f = self._f
+        convert = self._convert
+        # Visit the bands in file order so each is one contiguous read
+        a = y0
+        b = y1
+        while a < b:
+            if self.top_down:
+                top = a
+                bottom = min(b, a + k)
+                a = bottom
+                f.seek(self._offset + (top - y) * rb)
+            else:
+                bottom = b
+                top = max(a, b - k)
+                b = top
+                f.seek(self._offset + (self.height - bottom + y) * rb)
+            rows = bottom - top
+            f.readinto(src[:rows * rb])
+            for j in range(rows):
+                # File row j is screen row top + j, or bottom - 1 - j
+                r = j if self.top_down else rows - 1 - j
+                convert(src[j * rb + skip:], dst[r * n * 2:], n)
+            out = dst[:rows * n * 2]
+            if direct:
+                bus.begin(x0 + xs, top + ys, x1 - 1 + xs, bottom - 1 + ys)
+                bus.write(out)
+                bus.end()
+            else:
+                display.blit((out, n, rows, framebuf.RGB565), x0, top)
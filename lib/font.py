@@ -18,11 +18,12 @@ class Font:
         
     def reverse(self):
         """Return True if the font bit order is reversed."""
-        return False
+        return True  # font8x8_basic rows have the leftmost pixel in bit 0
         
     def get_ch(self, ch):
-        """Get the bitmap for a character."""
-        return self.font.get(ch, self.font.get('?', [0]*8))
+        """Get (bitmap, height, width) for a character, as font-to-py does."""
+        rows = self.font.get(ch) or self.font.get(ch.upper()) or self.font.get(' ', [0] * self._height)
+        return bytes(rows), self._height, self._width
         
     def get_width(self, _):
         """Get the width of a character."""
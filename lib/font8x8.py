@@ -0,0 +1,94 @@
+# Code generated by fontconv.py.
+# Font: font8x8_basic.py
+
+from binfont import BinFont
+
+_font =\
+b'\x08\x00\x00\x00\x00\x00\x00\x00\x00\x00\x08\x00\x18\x3c\x3c\x18'\
+b'\x18\x00\x18\x00\x08\x00\x6c\x6c\x48\x00\x00\x00\x00\x00\x08\x00'\
+b'\x6c\x6c\xfe\x6c\xfe\x6c\x6c\x00\x08\x00\x30\x7c\xc0\x78\x0c\xf8'\
+b'\x30\x00\x08\x00\x00\xc6\xcc\x18\x30\x66\xc6\x00\x08\x00\x38\x6c'\
+b'\x38\x76\xdc\xcc\x76\x00\x08\x00\x60\x60\xc0\x00\x00\x00\x00\x00'\
+b'\x08\x00\x18\x30\x60\x60\x60\x30\x18\x00\x08\x00\x60\x30\x18\x18'\
+b'\x18\x30\x60\x00\x08\x00\x00\x66\x3c\xff\x3c\x66\x00\x00\x08\x00'\
+b'\x00\x30\x30\xfc\x30\x30\x00\x00\x08\x00\x00\x00\x00\x00\x30\x30'\
+b'\x60\x00\x08\x00\x00\x00\x00\xfc\x00\x00\x00\x00\x08\x00\x00\x00'\
+b'\x00\x00\x30\x30\x00\x00\x08\x00\x06\x0c\x18\x30\x60\xc0\x80\x00'\
+b'\x08\x00\x7c\xc6\xce\xde\xf6\xe6\x7c\x00\x08\x00\x30\x70\xf0\x30'\
+b'\x30\x30\xfc\x00\x08\x00\x78\xcc\x0c\x38\x60\xcc\xfc\x00\x08\x00'\
+b'\x78\xcc\x0c\x38\x0c\xcc\x78\x00\x08\x00\x1c\x3c\x6c\xcc\xfe\x0c'\
+b'\x1e\x00\x08\x00\xfc\xc0\xf8\x0c\x0c\xcc\x78\x00\x08\x00\x38\x60'\
+b'\xc0\xf8\xcc\xcc\x78\x00\x08\x00\xfc\xcc\x0c\x18\x30\x30\x30\x00'\
+b'\x08\x00\x78\xcc\xcc\x78\xcc\xcc\x78\x00\x08\x00\x78\xcc\xcc\x7c'\
+b'\x0c\x18\x70\x00\x08\x00\x30\x78\xcc\xcc\xfc\xcc\xcc\x00\x08\x00'\
+b'\xfc\x66\x66\x7c\x66\x66\xfc\x00\x08\x00\x3c\x66\xc0\xc0\xc0\x66'\
+b'\x3c\x00\x08\x00\xf8\x6c\x66\x66\x66\x6c\xf8\x00\x08\x00\xfe\x62'\
+b'\x68\x78\x68\x62\xfe\x00\x08\x00\xfe\x62\x68\x78\x68\x60\xf0\x00'\
+b'\x08\x00\x3c\x66\xc0\xc0\xce\x66\x3e\x00\x08\x00\xcc\xcc\xcc\xfc'\
+b'\xcc\xcc\xcc\x00\x08\x00\x78\x30\x30\x30\x30\x30\x78\x00\x08\x00'\
+b'\x1e\x0c\x0c\x0c\xcc\xcc\x78\x00\x08\x00\xe6\x66\x6c\x78\x6c\x66'\
+b'\xe6\x00\x08\x00\xf0\x60\x60\x60\x62\x66\xfe\x00\x08\x00\xc6\xee'\
+b'\xfe\xfe\xd6\xc6\xc6\x00\x08\x00\xc6\xe6\xf6\xde\xce\xc6\xc6\x00'\
+b'\x08\x00\x78\xcc\xcc\xcc\xcc\xcc\x78\x00\x08\x00\xfc\x66\x66\xfc'\
+b'\x60\x60\xf0\x00\x08\x00\x78\xcc\xcc\xcc\xdc\x78\x1c\x00\x08\x00'\
+b'\xfc\x66\x66\xfc\x6c\x66\xe6\x00\x08\x00\x78\xcc\xe0\x70\x1c\xcc'\
+b'\x78\x00\x08\x00\xfc\xb4\x30\x30\x30\x30\x78\x00\x08\x00\xcc\xcc'\
+b'\xcc\xcc\xcc\xcc\xfc\x00\x08\x00\xcc\xcc\xcc\xcc\xcc\x78\x30\x00'\
+b'\x08\x00\xc6\xc6\xd6\xfe\xfe\xee\xc6\x00\x08\x00\xc6\xc6\x6c\x38'\
+b'\x38\x6c\xc6\x00\x08\x00\xcc\xcc\xcc\x78\x30\x30\x78\x00\x08\x00'\
+b'\xfe\xc6\x8c\x18\x32\x66\xfe\x00'
+
+_index =\
+b'\x00\x00\x0a\x00\x0a\x00\x14\x00\x14\x00\x1e\x00\x1e\x00\x28\x00'\
+b'\x28\x00\x32\x00\x32\x00\x3c\x00\x3c\x00\x46\x00\x46\x00\x50\x00'\
+b'\x50\x00\x5a\x00\x5a\x00\x64\x00\x64\x00\x6e\x00\x6e\x00\x78\x00'\
+b'\x78\x00\x82\x00\x82\x00\x8c\x00\x8c\x00\x96\x00\x96\x00\xa0\x00'\
+b'\xa0\x00\xaa\x00\xaa\x00\xb4\x00\xb4\x00\xbe\x00\xbe\x00\xc8\x00'\
+b'\xc8\x00\xd2\x00\xd2\x00\xdc\x00\xdc\x00\xe6\x00\xe6\x00\xf0\x00'\
+b'\xf0\x00\xfa\x00\xfa\x00\x04\x01\x00\x00\x0a\x00\x00\x00\x0a\x00'\
+b'\x00\x00\x0a\x00\x00\x00\x0a\x00\x00\x00\x0a\x00\x00\x00\x0a\x00'\
+b'\x00\x00\x0a\x00\x04\x01\x0e\x01\x0e\x01\x18\x01\x18\x01\x22\x01'\
+b'\x22\x01\x2c\x01\x2c\x01\x36\x01\x36\x01\x40\x01\x40\x01\x4a\x01'\
+b'\x4a\x01\x54\x01\x54\x01\x5e\x01\x5e\x01\x68\x01\x68\x01\x72\x01'\
+b'\x72\x01\x7c\x01\x7c\x01\x86\x01\x86\x01\x90\x01\x90\x01\x9a\x01'\
+b'\x9a\x01\xa4\x01\xa4\x01\xae\x01\xae\x01\xb8\x01\xb8\x01\xc2\x01'\
+b'\xc2\x01\xcc\x01\xcc\x01\xd6\x01\xd6\x01\xe0\x01\xe0\x01\xea\x01'\
+b'\xea\x01\xf4\x01\xf4\x01\xfe\x01\xfe\x01\x08\x02\x00\x00\x0a\x00'\
+b'\x00\x00\x0a\x00\x00\x00\x0a\x00\x00\x00\x0a\x00\x00\x00\x0a\x00'\
+b'\x00\x00\x0a\x00\x04\x01\x0e\x01\x0e\x01\x18\x01\x18\x01\x22\x01'\
+b'\x22\x01\x2c\x01\x2c\x01\x36\x01\x36\x01\x40\x01\x40\x01\x4a\x01'\
+b'\x4a\x01\x54\x01\x54\x01\x5e\x01\x5e\x01\x68\x01\x68\x01\x72\x01'\
+b'\x72\x01\x7c\x01\x7c\x01\x86\x01\x86\x01\x90\x01\x90\x01\x9a\x01'\
+b'\x9a\x01\xa4\x01\xa4\x01\xae\x01\xae\x01\xb8\x01\xb8\x01\xc2\x01'\
+b'\xc2\x01\xcc\x01\xcc\x01\xd6\x01\xd6\x01\xe0\x01\xe0\x01\xea\x01'\
+b'\xea\x01\xf4\x01\xf4\x01\xfe\x01\xfe\x01\x08\x02\x00\x00\x0a\x00'\
+b'\x00\x00\x0a\x00\x00\x00\x0a\x00\x00\x00\x0a\x00'
+
+_advance =\
+b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'\
+b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'\
+b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'\
+b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'\
+b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'\
+b'\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08\x08'
+
+_ink =\
+b'\x01\x06\x06\x07\x06\x07\x07\x03\x05\x05\x08\x06\x04\x06\x04\x07'\
+b'\x07\x06\x06\x06\x07\x06\x06\x06\x06\x06\x01\x01\x01\x01\x01\x01'\
+b'\x01\x06\x07\x07\x07\x07\x07\x07\x06\x05\x07\x07\x07\x07\x07\x06'\
+b'\x07\x06\x07\x06\x06\x06\x06\x07\x07\x06\x07\x01\x01\x01\x01\x01'\
+b'\x01\x06\x07\x07\x07\x07\x07\x07\x06\x05\x07\x07\x07\x07\x07\x06'\
+b'\x07\x06\x07\x06\x06\x06\x06\x07\x07\x06\x07\x01\x01\x01\x01'
+
+_f = BinFont(_font, _index, 8, 8, 32, 126, 32, True, 1, (_advance, _ink))
+
+height = _f.height
+max_width = _f.max_width
+hmap = _f.hmap
+reverse = _f.reverse
+monospaced = _f.monospaced
+min_ch = _f.min_ch
+max_ch = _f.max_ch
+bpp = _f.bpp
+widths = _f.widths
+get_ch = _f.get_ch
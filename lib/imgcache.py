@@ -0,0 +1,154 @@
+# imgcache.py Decoded image cache with a byte budget and LRU eviction.
+#
+# Images are read from flash once and kept as FrameBuffers that
+# LCD_1inch3.blit() copies straight from RAM. When a new image does not fit,
+# the least recently used ones are dropped; images larger than the whole
+# budget are never cached and are streamed from flash on every draw.
+#
+# Pixels are kept big-endian, as the panel reads them and as LCD_1inch3
+# stores them, so blits copy them unchanged (a key color for blit() must be
+# byte-swapped likewise). Caching only suits the RGB565 display mode.
+#
+# cache = ImageCache(32 * 1024, pack=AssetPack("icons.pak"))
+# cache.draw(lcd, "setting", 0, 0)
+# print(cache.hits, cache.misses, cache.evictions)
+
+import framebuf
+from assetpack import FMT_RGB565, FMT_RLE565
+from rle565 import Decoder
+
+
+class Image(framebuf.FrameBuffer):
+    """An RGB565 FrameBuffer that knows its size and buffer."""
+
+    def __init__(self, buf, width, height, stride=None):
+        super().__init__(buf, width, height, framebuf.RGB565, stride or width)
+        self.buffer = buf
+        self.width = width
+        self.height = height
+
+
+class ImageCache:
+    def __init__(self, budget=32 * 1024, pack=None):
+        self.budget = budget  # Bytes of pixel data kept at most
+        self.pack = pack  # AssetPack searched before the filesystem
+        self.used = 0
+        self._images = {}
+        self._order = []  # Keys, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _open(self, key):
+        # Returns (file, offset, width, height, format, owned)
+        pack = self.pack
+        if pack is not None and key in pack:
+            f, (offset, _, w, h, fmt) = pack.open(key)
+            if fmt != FMT_RGB565 and fmt != FMT_RLE565:
+                raise ValueError("Unsupported asset format")
+            return f, offset, w, h, fmt, False
+        f = open(key, "rb")
+        if key.endswith(".rle"):
+            dec = Decoder(f)
+            return f, 0, dec.width, dec.height, FMT_RLE565, True
+        # A .raw file has no header: only square images can be sized
+        size = f.seek(0, 2)
+        w = int((size // 2) ** 0.5)
+        if w * w * 2 != size:
+            f.close()
+            raise ValueError("Not a square .raw image")
+        return f, 0, w, w, FMT_RGB565, True
+
+    def get(self, key):
+        """Return the cached Image for key, loading it on a miss.
+
+        key is an asset name in the pack or a .raw or .rle path. Returns
+        None when the image is larger than the whole budget. A .raw file
+        must be square; other sizes raise ValueError.
+        """
+        img = self._images.get(key)
+        if img is not None:
+            self.hits += 1
+            order = self._order
+            if order[-1] != key:
+                order.remove(key)
+                order.append(key)
+            return img
+        self.misses += 1
+        f, offset, w, h, fmt, owned = self._open(key)
+        try:
+            nbytes = w * h * 2
+            if nbytes > self.budget:
+                return None
+            while self.used + nbytes > self.budget:
+                self._evict()
+            buf = bytearray(nbytes)
+            if fmt == FMT_RLE565:
+                dec = Decoder(f, offset)
+                mv = memoryview(buf)
+                for y in range(0, nbytes, w * 2):
+                    dec.readrow(mv[y:y + w * 2])
+            else:
+                f.seek(offset)
+                f.readinto(buf)
+        finally:
+            if owned:
+                f.close()
+        img = Image(buf, w, h)
+        self._images[key] = img
+        self._order.append(key)
+        self.used += nbytes
+        return img
+
+    def _evict(self):
+        key = self._order.pop(0)
+        img = self._images.pop(key)
+        self.used -= len(img.buffer)
+        self.evictions += 1
+
+    def draw(self, display, key, x, y, clip=None):
+        """Draw key at (x, y) on an LCD_1inch3, from RAM when it fits.
+
+        clip=(x, y, w, h) limits drawing to that screen rectangle.
+        """
+        img = self.get(key)
+        if img is None:
+            # Too large to cache
+            self.stream(display, key, x, y, clip)
+            return
+        if clip is None:
+            display.blit(img, x, y)
+            return
+        x0 = max(x, clip[0])
+        y0 = max(y, clip[1])
+        x1 = min(x + img.width, clip[0] + clip[2])
+        y1 = min(y + img.height, clip[1] + clip[3])
+        if x0 >= x1 or y0 >= y1:
+            return
+        # A view of the visible part, using the image's row stride
+        start = ((y0 - y) * img.width + x0 - x) * 2
+        view = Image(memoryview(img.buffer)[start:], x1 - x0, y1 - y0, img.width)
+        display.blit(view, x0, y0)
+
+    def stream(self, display, key, x, y, clip=None):
+        """Draw key straight from flash, leaving the cache untouched.
+
+        For images drawn once per screen, which would only evict the ones
+        worth keeping.
+        """
+        if self.pack is not None and key in self.pack:
+            self.pack.blit(display, key, x, y, clip)
+        elif key.endswith(".rle"):
+            with open(key, "rb") as f:
+                display.blit_rle565(f, x, y, 0, clip)
+        else:
+            display.blit_raw_image(key, x, y, clip=clip)
+
+    def clear(self):
+        self._images = {}
+        self._order = []
+        self.used = 0
+
+    def stats(self):
+        """Return (hits, misses, evictions, bytes used)."""
+        return self.hits, self.misses, self.evictions, self.used
@@ -0,0 +1,516 @@
+# jpeg.py Baseline JPEG decoder streaming MCU rows to the display.
+#
+# Handles baseline (and extended 8-bit Huffman) files with one interleaved
+# scan: grayscale, or YCbCr with chroma subsampled by 1 or 2 in each
+# direction (4:4:4, 4:2:2, 4:2:0), and restart intervals. Progressive files
+# are rejected.
+#
+# Only one row of MCUs is held at a time: the blocks of a row are entropy
+# decoded, transformed by an integer IDCT into per-component planes, then
+# color converted into a band that goes out as one blit or panel window.
+# Working RAM therefore depends on the image width, not its height, and is
+# checked against a fixed budget.
+#
+# scale=2, 4 or 8 decodes at 1/2, 1/4 or 1/8 size: only the top left
+# 4x4, 2x2 or 1x1 coefficients of each block are transformed (the 1/8 case
+# is the DC term alone), so smaller output is also faster.
+#
+# with open("photo.jpg", "rb") as f:
+#     JPEG(f, scale=2).draw(lcd, 0, 0)
+
+import framebuf
+import micropython
+import struct
+from array import array
+from micropython import const
+
+_RAM_BUDGET = const(32768)  # Bytes for component planes and the output band
+_READ_CHUNK = const(512)
+
+_SOF0 = const(0xC0)
+_SOF1 = const(0xC1)
+_SOF2 = const(0xC2)
+_DHT = const(0xC4)
+_SOI = const(0xD8)
+_EOI = const(0xD9)
+_SOS = const(0xDA)
+_DQT = const(0xDB)
+_DRI = const(0xDD)
+
+# Natural (row-major) index of each coefficient in zigzag order
+_ZIGZAG = bytes((
+    0, 1, 8, 16, 9, 2, 3, 10, 17, 24, 32, 25, 18, 11, 4, 5,
+    12, 19, 26, 33, 40, 48, 41, 34, 27, 20, 13, 6, 7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36, 29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46, 53, 60, 61, 54, 47, 55, 62, 63,
+))
+
+
+def _idct_table(n):
+    # tab[x * 8 + u] = C(u) cos((2x + 1) u pi / 2n), scaled by 2048.
+    # _idct() descales the column pass by 2048 (>> 11) and the row pass by
+    # 8192 (>> 13), which is 2048 times the 1/4 of the 2-D IDCT.
+    # An n-point IDCT of the top left n x n coefficients yields the block
+    # scaled down by 8 / n.
+    from math import cos, pi, sqrt
+    tab = array("i", bytes(256))
+    for x in range(n):
+        for u in range(n):
+            c = sqrt(0.5) if u == 0 else 1.0
+            tab[x * 8 + u] = int(round(c * cos((2 * x + 1) * u * pi / (2 * n)) * 2048))
+    return tab
+
+
+@micropython.viper
+def _idct(blk: ptr32, tab: ptr32, out: ptr8, ns: int):
+    # blk holds 64 coefficients followed by 64 words of scratch. ns packs
+    # the transform size (low 4 bits) and the output row stride.
+    n = ns & 15
+    stride = ns >> 4
+    u = 0
+    while u < n:  # Columns, into the scratch half
+        y = 0
+        while y < n:
+            acc = 0
+            v = 0
+            while v < n:
+                acc += tab[y * 8 + v] * blk[v * 8 + u]
+                v += 1
+            blk[64 + y * 8 + u] = (acc + 1024) >> 11
+            y += 1
+        u += 1
+    y = 0
+    while y < n:  # Rows, level shifted and clamped
+        x = 0
+        while x < n:
+            acc = 0
+            u = 0
+            while u < n:
+                acc += tab[x * 8 + u] * blk[64 + y * 8 + u]
+                u += 1
+            p = ((acc + 4096) >> 13) + 128
+            if p < 0:
+                p = 0
+            elif p > 255:
+                p = 255
+            out[y * stride + x] = p
+            x += 1
+        y += 1
+
+
+@micropython.viper
+def _ycc565(yp: ptr8, c: ptr8, dst: ptr8, packed: int):
+    # packed: pixel count (12 bits), horizontal chroma shift (1 bit), then
+    # the offset of the Cr row from the Cb row
+    n = packed & 0xFFF
+    hs = (packed >> 12) & 1
+    off = packed >> 13
+    i = 0
+    o = 0
+    while i < n:
+        j = i >> hs
+        cb = c[j] - 128
+        cr = c[j + off] - 128
+        yy = (yp[i] << 16) + 32768
+        r = (yy + 91881 * cr) >> 16
+        g = (yy - 22554 * cb - 46802 * cr) >> 16
+        b = (yy + 116130 * cb) >> 16
+        if r < 0:
+            r = 0
+        elif r > 255:
+            r = 255
+        if g < 0:
+            g = 0
+        elif g > 255:
+            g = 255
+        if b < 0:
+            b = 0
+        elif b > 255:
+            b = 255
+        dst[o] = (r & 0xF8) | (g >> 5)
+        dst[o + 1] = ((g << 3) & 0xE0) | (b >> 3)
+        i += 1
+        o += 2
+
+
+@micropython.viper
+def _gray565(yp: ptr8, dst: ptr8, n: int):
+    i = 0
+    o = 0
+    while i < n:
+        v = yp[i]
+        dst[o] = (v & 0xF8) | (v >> 5)
+        dst[o + 1] = ((v << 3) & 0xE0) | (v >> 3)
+        i += 1
+        o += 2
+
+
+class _Huffman:
+    def __init__(self, counts, symbols):
+        self.symbols = symbols
+        # Codes of up to 9 bits decode with one lookup of the next 9 bits
+        self.look_len = bytearray(512)
+        self.look_val = bytearray(512)
+        self.maxcode = [-1] * 17
+        self.valptr = [0] * 17
+        code = 0
+        k = 0
+        for length in range(1, 17):
+            n = counts[length - 1]
+            self.valptr[length] = k - code
+            for _ in range(n):
+                if length <= 9:
+                    span = 1 << (9 - length)
+                    first = code << (9 - length)
+                    for i in range(first, first + span):
+                        self.look_len[i] = length
+                        self.look_val[i] = symbols[k]
+                code += 1
+                k += 1
+            if n:
+                self.maxcode[length] = code - 1
+            code <<= 1
+
+
+class JPEG:
+    def __init__(self, f, scale=1, budget=_RAM_BUDGET):
+        if scale not in (1, 2, 4, 8):
+            raise ValueError("scale must be 1, 2, 4 or 8")
+        self._f = f
+        self._n = 8 // scale  # Transform size
+        self._budget = budget
+        self._qt = [None] * 4
+        self._dc = [None] * 4
+        self._ac = [None] * 4
+        self._interval = 0
+        self._comps = []
+        self._read_headers()
+
+    # ---------- Headers ----------
+
+    def _read_headers(self):
+        f = self._f
+        if f.read(2) != b"\xff\xd8":
+            raise ValueError("Not a JPEG file")
+        while True:
+            b = f.read(1)
+            if not b:
+                raise ValueError("No image data")
+            if b[0] != 0xFF:
+                continue
+            m = f.read(1)[0]
+            while m == 0xFF:  # Fill bytes
+                m = f.read(1)[0]
+            if m == _SOI or 0xD0 <= m <= 0xD7:
+                continue
+            if m == _EOI:
+                raise ValueError("No image data")
+            length = struct.unpack(">H", f.read(2))[0] - 2
+            if m == _DQT:
+                self._read_dqt(f.read(length))
+            elif m == _DHT:
+                self._read_dht(f.read(length))
+            elif m == _SOF0 or m == _SOF1:
+                self._read_sof(f.read(length))
+            elif m == _DRI:
+                self._interval = struct.unpack(">H", f.read(length))[0]
+            elif m == _SOS:
+                self._read_sos(f.read(length))
+                return
+            elif 0xC0 <= m <= 0xCF and m != 0xC8 and m != 0xCC:
+                raise ValueError("Only baseline JPEG is supported")
+            else:
+                f.seek(length, 1)  # APPn, COM, ...
+
+    def _read_dqt(self, seg):
+        i = 0
+        while i < len(seg):
+            pq = seg[i] >> 4
+            tq = seg[i] & 3
+            if pq:  # 16-bit entries
+                self._qt[tq] = struct.unpack_from(">64H", seg, i + 1)
+                i += 129
+            else:
+                self._qt[tq] = tuple(seg[i + 1:i + 65])
+                i += 65
+
+    def _read_dht(self, seg):
+        i = 0
+        while i < len(seg):
+            tc = seg[i] >> 4
+            th = seg[i] & 3
+            counts = seg[i + 1:i + 17]
+            total = sum(counts)
+            table = _Huffman(counts, bytes(seg[i + 17:i + 17 + total]))
+            if tc:
+                self._ac[th] = table
+            else:
+                self._dc[th] = table
+            i += 17 + total
+
+    def _read_sof(self, seg):
+        if seg[0] != 8:
+            raise ValueError("Only 8-bit JPEG is supported")
+        h, w, nc = struct.unpack_from(">HHB", seg, 1)
+        if nc not in (1, 3):
+            raise ValueError("Only grayscale and YCbCr JPEG are supported")
+        self._src_w = w
+        self._src_h = h
+        scale = 8 // self._n
+        self.width = (w + scale - 1) // scale
+        self.height = (h + scale - 1) // scale
+        ids = []
+        for i in range(nc):
+            cid, hv, tq = seg[6 + 3 * i:9 + 3 * i]
+            ids.append(cid)
+            # [id, H, V, quant table, DC table, AC table, DC prediction]
+            self._comps.append([cid, hv >> 4, hv & 15, tq, None, None, 0])
+        if nc == 1:
+            # A non-interleaved scan codes one 8x8 block per MCU in raster
+            # order, whatever sampling factors the frame header declares
+            self._comps[0][1:3] = [1, 1]
+        self._hmax = max(c[1] for c in self._comps)
+        self._vmax = max(c[2] for c in self._comps)
+
+    def _read_sos(self, seg):
+        ns = seg[0]
+        if ns != len(self._comps):
+            raise ValueError("Only single-scan interleaved JPEG is supported")
+        for i in range(ns):
+            cid, t = seg[1 + 2 * i:3 + 2 * i]
+            for c in self._comps:
+                if c[0] == cid:
+                    c[4] = self._dc[t >> 4]
+                    c[5] = self._ac[t & 15]
+        for c in self._comps:
+            c[3] = self._qt[c[3]]
+
+    # ---------- Entropy decoding ----------
+
+    def _byte(self):
+        if self._pos >= self._len:
+            self._len = self._f.readinto(self._buf) or 0
+            self._pos = 0
+            if not self._len:
+                self._marker = _EOI
+                return 0
+        b = self._buf[self._pos]
+        self._pos += 1
+        return b
+
+    def _fill(self):
+        acc = self._acc
+        nbits = self._nbits
+        while nbits <= 16:
+            b = 0  # After a marker the data is padded with zeros
+            if not self._marker:
+                b = self._byte()
+                if b == 0xFF:
+                    m = self._byte()
+                    while m == 0xFF:
+                        m = self._byte()
+                    if m:
+                        self._marker = m
+                        b = 0
+            acc = (acc << 8) | b
+            nbits += 8
+        self._acc = acc
+        self._nbits = nbits
+
+    def _huff(self, h):
+        if self._nbits < 16:
+            self._fill()
+        nbits = self._nbits
+        acc = self._acc
+        peek = (acc >> (nbits - 9)) & 511
+        length = h.look_len[peek]
+        if length:
+            sym = h.look_val[peek]
+        else:
+            maxcode = h.maxcode
+            length = 10
+            code = (acc >> (nbits - 10)) & 1023
+            while code > maxcode[length]:
+                length += 1
+                if length > 16:
+                    raise ValueError("Corrupt JPEG data")
+                code = (acc >> (nbits - length)) & ((1 << length) - 1)
+            sym = h.symbols[code + h.valptr[length]]
+        nbits -= length
+        self._nbits = nbits
+        self._acc = acc & ((1 << nbits) - 1)
+        return sym
+
+    def _bits(self, s):
+        # Receive s bits and extend them to a signed value
+        if self._nbits < s:
+            self._fill()
+        nbits = self._nbits - s
+        v = (self._acc >> nbits) & ((1 << s) - 1)
+        self._nbits = nbits
+        self._acc &= (1 << nbits) - 1
+        if v < 1 << (s - 1):
+            v -= (1 << s) - 1
+        return v
+
+    def _restart(self):
+        self._acc = 0
+        self._nbits = 0
+        if not self._marker:  # Find the RSTn marker
+            while True:
+                if self._byte() == 0xFF:
+                    m = self._byte()
+                    if 0xD0 <= m <= 0xD7 or m == _EOI:
+                        break
+        self._marker = 0
+        for c in self._comps:
+            c[6] = 0
+
+    def _block(self, c, keep):
+        # Decode one block of component c into self._blk (natural order,
+        # dequantized); coefficients outside the transform are dropped
+        blk = self._blk
+        q = c[3]
+        s = self._huff(c[4])
+        if s:
+            c[6] += self._bits(s)
+        blk[0] = c[6] * q[0]
+        ac = c[5]
+        k = 1
+        while k < 64:
+            rs = self._huff(ac)
+            s = rs & 15
+            if s:
+                k += rs >> 4
+                v = self._bits(s)
+                i = keep[k]
+                if i != 255:
+                    blk[i] = v * q[k]
+                k += 1
+            elif rs == 0xF0:
+                k += 16
+            else:
+                break
+
+    # ---------- Output ----------
+
+    def draw(self, display, x=0, y=0, direct=False):
+        """Decode the image with its top left corner at (x, y), clipped to the screen.
+
+        Bands of one MCU row go through display.blit(), so LCD_1inch3 records
+        them as dirty. With direct=True, or on drivers without blit() such
+        as ST77xx, each band is written straight into a panel window.
+        Decoding stops below the bottom of the screen.
+        """
+        n = self._n
+        comps = self._comps
+        hmax = self._hmax
+        vmax = self._vmax
+        mcu_w = 8 * hmax
+        mcu_h = 8 * vmax
+        mcus_x = (self._src_w + mcu_w - 1) // mcu_w
+        mcus_y = (self._src_h + mcu_h - 1) // mcu_h
+        # One row of MCUs per component, then the RGB565 band
+        rows = vmax * n
+        planes = []
+        size = 0
+        for c in comps:
+            pw = mcus_x * c[1] * n
+            planes.append((pw, pw * c[2] * n))
+            size += pw * c[2] * n
+        out_w = self.width
+        size += out_w * rows * 2
+        if size > self._budget:
+            raise ValueError("JPEG needs {} bytes: use a larger scale".format(size))
+        color = len(comps) == 3
+        if color:
+            _, h1, v1 = comps[1][:3]
+            if comps[0][1:3] != [hmax, vmax] or comps[2][1:3] != [h1, v1] \
+                    or hmax // h1 > 2 or vmax // v1 > 2:
+                raise ValueError("Unsupported chroma subsampling")
+            hs = hmax // h1 - 1
+            vs = vmax // v1 - 1
+            # Cb and Cr planes back to back, so Cr is a fixed offset from Cb
+            cplane = planes[1][1]
+        mem = bytearray(size)
+        mv = memoryview(mem)
+        base = []
+        o = 0
+        for pw, psize in planes:
+            base.append(o)
+            o += psize
+        band = mv[o:]
+        self._blk = blk = array("i", bytes(512))
+        zero = array("i", bytes(256))
+        blk_mv = memoryview(blk)
+        tab = _idct_table(n)
+        keep = bytearray(b"\xff" * 64)
+        for k in range(64):
+            i = _ZIGZAG[k]
+            if i >> 3 < n and i & 7 < n:
+                keep[k] = i
+        self._buf = bytearray(_READ_CHUNK)
+        self._pos = 0
+        self._len = 0
+        self._acc = 0
+        self._nbits = 0
+        self._marker = 0
+        x0 = max(x, 0)
+        x1 = min(x + out_w, display.width)
+        y_end = min(y + self.height, display.height)
+        if x0 >= x1 or y >= y_end:
+            return
+        vis = x1 - x0
+        direct = direct or not hasattr(display, "blit")
+        if direct:
+            bus = display.bus
+            xs = getattr(display, "xstart", 0)
+            ys = getattr(display, "ystart", 0)
+        interval = self._interval
+        count = 0
+        for my in range(mcus_y):
+            top = y + my * rows
+            if top >= y_end:
+                break
+            for mx in range(mcus_x):
+                if interval and count and count % interval == 0:
+                    self._restart()
+                count += 1
+                for ci in range(len(comps)):
+                    c = comps[ci]
+                    pw = planes[ci][0]
+                    for v in range(c[2]):
+                        o = base[ci] + v * n * pw + mx * c[1] * n
+                        for h in range(c[1]):
+                            blk_mv[:64] = zero
+                            self._block(c, keep)
+                            if n == 1:
+                                p = ((blk[0] + 4) >> 3) + 128
+                                mem[o] = 0 if p < 0 else 255 if p > 255 else p
+                            else:
+                                _idct(blk, tab, mv[o:], n | pw << 4)
+                            o += n
+            # Color convert the rows of this MCU row that are on screen
+            r0 = max(0, -top)
+            r1 = min(rows, y_end - top)
+            if r0 >= r1:
+                continue
+            pw = planes[0][0]
+            for r in range(r0, r1):
+                dst = band[(r - r0) * out_w * 2:]
+                if color:
+                    cw = planes[1][0]
+                    _ycc565(mv[r * pw:], mv[base[1] + (r >> vs) * cw:], dst,
+                            out_w | hs << 12 | cplane << 13)
+                else:
+                    _gray565(mv[r * pw:], dst, out_w)
+            k = r1 - r0
+            skip = (x0 - x) * 2
+            if direct:
+                bus.begin(x0 + xs, top + r0 + ys, x1 - 1 + xs, top + r1 - 1 + ys)
+                for r in range(k):
+                    o = r * out_w * 2 + skip
+                    bus.write(band[o:o + vis * 2])
+                bus.end()
+            else:
+                display.blit((band[skip:], vis, k, framebuf.RGB565, out_w), x0, top + r0)
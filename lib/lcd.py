@@ -1,9 +1,14 @@
 from machine import Pin, SPI
 import time
 import framebuf
+import micropython
+from array import array
+from micropython import const
 from writer import Writer
-from font8x8_basic import font as font_dict
-from font import Font
+import font8x8
+import blend
+from lcdbus import LCDBus, INIT_1INCH3
+from rle565 import Decoder
 
 # Pin definitions
 BL = 13    # Backlight
@@ -13,288 +18,713 @@ MOSI = 11  # SPI MOSI
 SCK = 10   # SPI Clock
 CS = 9     # Chip Select
 
+# Damage tracking
+_MAX_DIRTY = const(16)    # Rectangles kept before they are folded together
+_MERGE_SLACK = const(64)  # Extra pixels worth sending to save one window setup
+
+# Indexed modes: rows expanded through the palette per flush chunk
+_EXPAND_LINES = const(8)
+
+# Raw images streamed to the panel are read in chunks of this many bytes
+_RAW_CHUNK = const(4096)
+
+# Vertical scrolling
+_VSCRDEF = const(0x33)
+_VSCSAD = const(0x37)
+_MADCTL = const(0x36)
+_GATE_LINES = const(320)  # ST7789 frame memory rows
+
+
+# Two-entry palette for CWriter's colour blits
+class BoolPalette(framebuf.FrameBuffer):
+    def __init__(self, mode):
+        buf = bytearray(4)  # Large enough for one RGB565 pixel pair
+        super().__init__(buf, 2, 1, mode)
+
+    def fg(self, color):  # Set foreground color
+        self.pixel(1, 0, color)
+
+    def bg(self, color):
+        self.pixel(0, 0, color)
+
+
+# Palette expansion kernels. lut holds one RGB565 entry per index in panel
+# byte order, so each pixel is a single 16-bit copy.
+@micropython.viper
+def _expand8(src: ptr8, dst: ptr16, lut: ptr16, n: int):
+    for i in range(n):
+        dst[i] = lut[src[i]]
+
+
+@micropython.viper
+def _expand4(src: ptr8, dst: ptr16, lut: ptr16, n: int):
+    # GS4_HMSB: two pixels per byte, the left one in the high nibble
+    j = 0
+    for i in range(n):
+        v = src[i]
+        dst[j] = lut[v >> 4]
+        dst[j + 1] = lut[v & 15]
+        j += 2
+
+
+# Scale/rotate blits: dst[i * step] = src[tab[i]], packed is n | step << 12
+@micropython.viper
+def _gather(src: ptr16, dst: ptr16, tab: ptr16, packed: int):
+    n = packed & 0xFFF
+    step = packed >> 12
+    o = 0
+    for i in range(n):
+        dst[o] = src[tab[i]]
+        o += step
+
+
 class LCD_1inch3(framebuf.FrameBuffer):
-    def __init__(self):
+    # buffers=1, lines=240 is one full frame (115 KB). buffers=2 adds a back
+    # buffer for flip(). lines below 240 makes each buffer a horizontal band
+    # of that many rows: draw the whole scene once per band in bands(), e.g.
+    # buffers=2, lines=120 double-buffers in the RAM of one full frame.
+    # mode=framebuf.GS4_HMSB or GS8 stores 4- or 8-bit palette indices
+    # (28.8 KB or 57.6 KB per full frame) expanded to RGB565 while flushing;
+    # the color attributes are then palette indices.
+    # madctl overrides the memory access control byte (0x70, rotated for the
+    # upright board). Hardware scrolling runs along the panel's gate lines,
+    # which with MV set is horizontal on screen: use a value without MV
+    # (0x20 bit), such as 0x00, for vertically scrolling text.
+    def __init__(self, flush=None, buffers=1, lines=240, mode=framebuf.RGB565,
+                 madctl=0x70):
         self.width = 240
         self.height = 240
-        
+        if not 0 < lines <= self.height or self.height % lines:
+            raise ValueError("lines must divide the panel height")
+        if buffers not in (1, 2):
+            raise ValueError("buffers must be 1 or 2")
+        self.lines = lines
+        self._oy = 0  # Screen row of buffer row 0
+        self.mode = mode
+        self.madctl = madctl
+        self.scroll_start = 0
+        self._vs = bytearray(6)
+        if mode == framebuf.RGB565:
+            self._pitch = self.width * 2
+            self.lut = None
+        elif mode == framebuf.GS8:
+            self._pitch = self.width
+            self.lut = bytearray(512)
+            self._expand = _expand8
+        elif mode == framebuf.GS4_HMSB:
+            self._pitch = self.width // 2
+            self.lut = bytearray(32)
+            self._expand = _expand4
+        else:
+            raise ValueError("mode must be RGB565, GS8 or GS4_HMSB")
+        self.palette = BoolPalette(mode)
+
         self.cs = Pin(CS, Pin.OUT)
         self.rst = Pin(RST, Pin.OUT)
-        
+
         self.cs(1)
         self.spi = SPI(1, 100000_000, polarity=0, phase=0, sck=Pin(SCK), mosi=Pin(MOSI), miso=None)
         self.dc = Pin(DC, Pin.OUT)
         self.dc(1)
-        
-        # Initialize with a smaller buffer (one line at a time)
-        self.buffer = bytearray(self.width * 2)  # Single line buffer (240 pixels * 2 bytes)
-        super().__init__(self.buffer, self.width, 1, framebuf.RGB565)
-        
+        self.bus = LCDBus(self.spi, self.cs, self.dc, self.rst, flush=flush)
+
+        self._bufs = [bytearray(self._pitch * lines) for _ in range(buffers)]
+        self._mvs = [memoryview(b) for b in self._bufs]
+        self._fbs = [framebuf.FrameBuffer(b, self.width, lines, mode) for b in self._bufs]
+        self._select(0)
+        super().__init__(self.buffer, self.width, lines, mode)
+        if self.lut is not None:
+            self._line = bytearray(self.width * 2 * _EXPAND_LINES)
+            self._line_mv = memoryview(self._line)
+
+        # Dirty rectangles as (x0, y0, x1, y1) in screen coordinates,
+        # end coordinates exclusive
+        self._dirty = []
+        # Regions sent from the back buffer since the last flip(), which the
+        # front buffer does not have yet
+        self._stale = []
+        # Bytes per read when images are streamed past the buffer
+        self.chunk = _RAW_CHUNK
+        self._chunk_buf = None
+
         self.init_display()
-        self._line = 0  # Track current line for partial updates
-        
+
         self.red   = 0x07E0
         self.green = 0x001f
         self.blue  = 0xf800
         self.white = 0xffff
         self.black = 0x0000
+        if self.lut is not None:
+            # Default palette: the RGB565 colors above at indices 0..4
+            for i, name in enumerate(("black", "white", "red", "green", "blue")):
+                self.set_palette(i, getattr(self, name))
+                setattr(self, name, i)
         # Initialize font
-        self.font = Font(font_dict, width=8, height=8)
+        self.font = font8x8
         # Initialize writer with our display and font
         self.writer = Writer(self, self.font)
-        # Set a default background color
-        self.fill(self.white)
-        # Update the display
-        for _ in range(self.height):
-            self.show()
+        # Set a default background color and push it once: a single window
+        # over the whole panel, fed the blank buffer once per band
+        for fb in self._fbs:
+            fb.fill(self.white)
+        if self.lut is None:
+            self.bus.begin(0, 0, self.width - 1, self.height - 1)
+            for _ in range(self.height // lines):
+                self.bus.write(self.buffer)
+            self.bus.end()
+        else:
+            for _ in self.bands():
+                self.invalidate()
+                self.show()
+            self._stale = []
 
 
-    def write_cmd(self, cmd):
-        self.cs(1)
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([cmd]))
-        self.cs(1)
+    def init_display(self):
+        self.bus.reset()
+        self.bus.run(INIT_1INCH3)
+        if self.madctl != 0x70:
+            self.bus.command(_MADCTL, bytes((self.madctl,)))
 
-    def write_data(self, buf):
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(bytearray([buf]))
-        self.cs(1)
-        
-    def show(self):
-        """Update the display with the current buffer contents."""
-        # Set the window to the current line
-        self.write_cmd(0x2A)
-        self.write_data(0x00)
-        self.write_data(0x00)  # XS=0
-        self.write_data(0x00)
-        self.write_data(0xEF)  # XE=239
-        
-        self.write_cmd(0x2B)
-        self.write_data((self._line >> 8) & 0xFF)
-        self.write_data(self._line & 0xFF)  # YS=current line
-        self.write_data((self._line >> 8) & 0xFF)
-        self.write_data(self._line & 0xFF)  # YE=current line
-        
-        # Write the line data
-        self.write_cmd(0x2C)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(self.buffer)
-        self.cs(1)
-        
-        # Move to next line, wrap around if needed
-        self._line = (self._line + 1) % self.height
+    # ---------- Hardware vertical scrolling ----------
+
+    def vscrdef(self, tfa=0, vsa=None, bfa=None):
+        """Define the scroll area: tfa fixed top rows, vsa scrolling rows and
+        bfa fixed bottom rows. By default the whole panel scrolls."""
+        if vsa is None:
+            vsa = self.height - tfa
+        if bfa is None:
+            bfa = _GATE_LINES - tfa - vsa
+        b = self._vs
+        b[0] = tfa >> 8
+        b[1] = tfa & 0xFF
+        b[2] = vsa >> 8
+        b[3] = vsa & 0xFF
+        b[4] = bfa >> 8
+        b[5] = bfa & 0xFF
+        self.bus.command(_VSCRDEF, b)
+
+    def vscsad(self, line):
+        """Show frame memory row line at the top of the scroll area.
+
+        Drawing and show() keep using frame memory rows; only what the panel
+        displays moves, so scrolling costs one command.
+        """
+        self.scroll_start = line
+        b = self._vs
+        b[0] = line >> 8
+        b[1] = line & 0xFF
+        self.bus.command(_VSCSAD, memoryview(b)[:2])
+
+    @staticmethod
+    def rgb(r, g, b):
+        """RGB565 color from 8-bit components, byte-swapped for the buffer."""
+        c = (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3
+        return (c & 0xFF) << 8 | c >> 8
+
+    def blend_palette(self, fg, bg, levels):
+        """Palette blending anti-aliased glyph levels from bg to fg.
+
+        In the indexed modes colors cannot be mixed, so levels snap to one
+        of the two.
+        """
+        return blend.table(fg, bg, levels, True, self.mode)
+
+    def set_palette(self, idx, color):
+        """Set palette entry idx to an RGB565 color as returned by rgb()."""
+        x = idx << 1
+        self.lut[x] = color & 0xFF
+        self.lut[x + 1] = color >> 8
+        self.invalidate()
+
+    def _select(self, i):
+        self._cur = i
+        self.back = self._fbs[i]
+        self.front = self._fbs[1 - i] if len(self._fbs) > 1 else None
+        self.buffer = self._bufs[i]
+        self._mv = self._mvs[i]
+
+    def bands(self):
+        """Yield the top screen row of each band in turn.
+
+        Drawing uses screen coordinates and is clipped to the current band.
+        With full-height buffers this yields once.
+        """
+        for y in range(0, self.height, self.lines):
+            self._oy = y
+            yield y
+        self._oy = 0
+
+    # ---------- Damage tracking ----------
+
+    def mark_dirty(self, x, y, w, h):
+        """Record that the w x h area at (x, y) must be sent on the next show()."""
+        x0 = max(x, 0)
+        y0 = max(y, self._oy)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self._oy + self.lines)
+        if x0 >= x1 or y0 >= y1:
+            return
+        dirty = self._dirty
+        # Fold into an existing rectangle when the union costs little more
+        # than sending both separately.
+        area = (x1 - x0) * (y1 - y0)
+        best = -1
+        best_cost = 0
+        for i, r in enumerate(dirty):
+            ux0 = min(x0, r[0])
+            uy0 = min(y0, r[1])
+            ux1 = max(x1, r[2])
+            uy1 = max(y1, r[3])
+            cost = (ux1 - ux0) * (uy1 - uy0) - area - (r[2] - r[0]) * (r[3] - r[1])
+            if best < 0 or cost < best_cost:
+                best = i
+                best_cost = cost
+        if best >= 0 and (best_cost <= _MERGE_SLACK or len(dirty) >= _MAX_DIRTY):
+            r = dirty.pop(best)
+            # The union may now overlap others, so re-insert it
+            self.mark_dirty(min(x0, r[0]), min(y0, r[1]),
+                            max(x1, r[2]) - min(x0, r[0]), max(y1, r[3]) - min(y0, r[1]))
+            return
+        dirty.append((x0, y0, x1, y1))
 
-    def init_display(self):  
-        self.rst(1)
-        self.rst(0)
-        self.rst(1)
-        
-        self.write_cmd(0x36)
-        self.write_data(0x70)
+    def invalidate(self):
+        """Mark the whole screen (or current band) dirty."""
+        self._dirty = [(0, self._oy, self.width, self._oy + self.lines)]
 
-        self.write_cmd(0x3A) 
-        self.write_data(0x05)
+    def dirty_bytes(self):
+        """Number of pixel bytes the next show() will send."""
+        return sum((r[2] - r[0]) * (r[3] - r[1]) for r in self._dirty) * 2
 
-        self.write_cmd(0xB2)
-        self.write_data(0x0C)
-        self.write_data(0x0C)
-        self.write_data(0x00)
-        self.write_data(0x33)
-        self.write_data(0x33)
+    # ---------- FrameBuffer drawing, recording damage ----------
 
-        self.write_cmd(0xB7)
-        self.write_data(0x35) 
+    def fill(self, color):
+        self.back.fill(color)
+        self.invalidate()
+
+    def pixel(self, x, y, color=None):
+        if color is None:
+            return self.back.pixel(x, y - self._oy)
+        self.back.pixel(x, y - self._oy, color)
+        self.mark_dirty(x, y, 1, 1)
+
+    def hline(self, x, y, w, color):
+        self.back.hline(x, y - self._oy, w, color)
+        self.mark_dirty(x, y, w, 1)
 
-        self.write_cmd(0xBB)
-        self.write_data(0x19)
+    def vline(self, x, y, h, color):
+        self.back.vline(x, y - self._oy, h, color)
+        self.mark_dirty(x, y, 1, h)
 
-        self.write_cmd(0xC0)
-        self.write_data(0x2C)
+    def line(self, x1, y1, x2, y2, color):
+        oy = self._oy
+        self.back.line(x1, y1 - oy, x2, y2 - oy, color)
+        self.mark_dirty(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
 
-        self.write_cmd(0xC2)
-        self.write_data(0x01)
+    def rect(self, x, y, w, h, color, f=False):
+        self.back.rect(x, y - self._oy, w, h, color, f)
+        if f:
+            self.mark_dirty(x, y, w, h)
+        else:
+            # Four edges: a moving outline then costs its perimeter, not its area
+            self.mark_dirty(x, y, w, 1)
+            self.mark_dirty(x, y + h - 1, w, 1)
+            self.mark_dirty(x, y + 1, 1, h - 2)
+            self.mark_dirty(x + w - 1, y + 1, 1, h - 2)
 
-        self.write_cmd(0xC3)
-        self.write_data(0x12)   
+    def fill_rect(self, x, y, w, h, color):
+        self.back.fill_rect(x, y - self._oy, w, h, color)
+        self.mark_dirty(x, y, w, h)
+
+    def ellipse(self, x, y, xr, yr, color, f=False, m=0xF):
+        self.back.ellipse(x, y - self._oy, xr, yr, color, f, m)
+        self.mark_dirty(x - xr, y - yr, 2 * xr + 1, 2 * yr + 1)
 
-        self.write_cmd(0xC4)
-        self.write_data(0x20)
+    def poly(self, x, y, coords, color, f=False):
+        self.back.poly(x, y - self._oy, coords, color, f)
+        xs = coords[0::2]
+        ys = coords[1::2]
+        if xs:
+            self.mark_dirty(x + min(xs), y + min(ys),
+                            max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
 
-        self.write_cmd(0xC6)
-        self.write_data(0x0F) 
+    def text(self, s, x, y, color=1):
+        self.back.text(s, x, y - self._oy, color)
+        self.mark_dirty(x, y, 8 * len(s), 8)
 
-        self.write_cmd(0xD0)
-        self.write_data(0xA4)
-        self.write_data(0xA1)
+    def scroll(self, xstep, ystep):
+        self.back.scroll(xstep, ystep)
+        self.invalidate()
 
-        self.write_cmd(0xE0)
-        for d in [0xD0,0x04,0x0D,0x11,0x13,0x2B,0x3F,0x54,0x4C,0x18,0x0D,0x0B,0x1F,0x23]:
-            self.write_data(d)
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        self.back.blit(fbuf, x, y - self._oy, key, palette)
+        if isinstance(fbuf, tuple):
+            w, h = fbuf[1], fbuf[2]
+        else:
+            # Plain FrameBuffers do not expose their size: assume the worst
+            w = getattr(fbuf, "width", self.width)
+            h = getattr(fbuf, "height", self.height)
+        self.mark_dirty(x, y, w, h)
 
-        self.write_cmd(0xE1)
-        for d in [0xD0,0x04,0x0C,0x11,0x13,0x2C,0x3F,0x44,0x51,0x2F,0x1F,0x1F,0x20,0x23]:
-            self.write_data(d)
-        
-        self.write_cmd(0x21)
-        self.write_cmd(0x11)
-        self.write_cmd(0x29)
+    # ---------- Flush ----------
 
     def show(self):
-        self.write_cmd(0x2A)
-        self.write_data(0x00)
-        self.write_data(0x00)
-        self.write_data(0x00)
-        self.write_data(0xef)
-        
-        self.write_cmd(0x2B)
-        self.write_data(0x00)
-        self.write_data(0x00)
-        self.write_data(0x00)
-        self.write_data(0xEF)
-        
-        self.write_cmd(0x2C)
-        
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(self.buffer)
-        self.cs(1)
-        
-    def blit_raw_image(self, filename):
+        """Send the dirty regions of the buffer to the panel."""
+        dirty = self._dirty
+        if not dirty:
+            return
+        self._dirty = []
+        send = self._send if self.lut is None else self._send_indexed
+        for x0, y0, x1, y1 in dirty:
+            send(x0, y0, x1, y1)
+        if self.front is not None:
+            self._add_stale(dirty)
+
+    def _send(self, x0, y0, x1, y1):
+        bus = self.bus
+        mv = self._mv
+        stride = self._pitch
+        oy = self._oy
+        bus.begin(x0, y0, x1 - 1, y1 - 1)
+        if x0 == 0 and x1 == self.width:
+            # Full-width band is contiguous in the buffer
+            bus.write(mv[(y0 - oy) * stride:(y1 - oy) * stride])
+        else:
+            start = x0 * 2
+            end = x1 * 2
+            for y in range((y0 - oy) * stride, (y1 - oy) * stride, stride):
+                bus.write(mv[y + start:y + end])
+        bus.end()
+
+    def _send_indexed(self, x0, y0, x1, y1):
+        # Expand up to _EXPAND_LINES rows at a time into the line buffer
+        x0 &= ~1  # GS4 holds pixel pairs
+        x1 = (x1 + 1) & ~1
+        bus = self.bus
+        mv = self._mv
+        out = self._line_mv
+        lut = self.lut
+        expand = self._expand
+        stride = self._pitch
+        w = self.width
+        start = x0 * stride // w
+        n = x1 * stride // w - start  # Source bytes per row
+        rowbytes = (x1 - x0) * 2
+        chunk = len(self._line) // rowbytes
+        full = x0 == 0 and x1 == w
+        y = y0 - self._oy
+        end = y1 - self._oy
+        bus.begin(x0, y0, x1 - 1, y1 - 1)
+        while y < end:
+            k = min(chunk, end - y)
+            src = y * stride + start
+            if full:
+                expand(mv[src:src + n * k], out, lut, n * k)
+            else:
+                o = 0
+                for _ in range(k):
+                    expand(mv[src:src + n], out[o:o + rowbytes], lut, n)
+                    src += stride
+                    o += rowbytes
+            bus.write(out[:rowbytes * k])
+            y += k
+        bus.end()
+
+    def _send_async(self):
+        # Dirty regions widened to one full-width band, a single contiguous
+        # block of the back buffer
+        dirty = self._dirty
+        if not dirty:
+            return dirty
+        if self.lut is not None:
+            # Rows have to be expanded on the CPU: send in the foreground
+            self.show()
+            return dirty
+        self._dirty = []
+        y0 = min(r[1] for r in dirty)
+        y1 = max(r[3] for r in dirty)
+        stride = self.width * 2
+        oy = self._oy
+        self.bus.flush_async(0, y0, self.width - 1, y1 - 1,
+                             self._mv[(y0 - oy) * stride:(y1 - oy) * stride])
+        return dirty
+
+    def flush_async(self):
+        """Start sending the dirty rows in the background and return.
+
+        The dirty regions are widened to one full-width band so the transfer
+        is a single contiguous block. Do not draw until is_busy() is False or
+        wait_flush() has returned; with two buffers use flip() instead.
+        Indexed modes expand rows on the CPU and complete before returning.
+        """
+        self._send_async()
+
+    def wait_flush(self):
+        self.bus.wait_flush()
+
+    def is_busy(self):
+        return self.bus.is_busy()
+
+    def flip(self):
+        """Send the finished back buffer and continue drawing in the other one.
+
+        With one buffer this is show(). In banded mode the whole band is
+        sent, as each band is redrawn from scratch.
+        """
+        if self.lines < self.height:
+            self.invalidate()
+        if self.front is None:
+            self.show()
+            return
+        # The front buffer may still be going out from the previous flip()
+        self.bus.wait_flush()
+        sent = self._send_async()
+        self._select(self._cur ^ 1)
+        if self.lines == self.height:
+            # Bring the new back buffer up to date with what is on screen
+            self._add_stale(sent)
+            self._copy_forward(self._stale)
+        self._stale = []
+
+    def _add_stale(self, rects):
+        stale = self._stale
+        stale.extend(rects)
+        if len(stale) > _MAX_DIRTY:
+            self._stale = [(min(r[0] for r in stale), min(r[1] for r in stale),
+                            max(r[2] for r in stale), max(r[3] for r in stale))]
+
+    def _copy_forward(self, rects):
+        src = self._mvs[self._cur ^ 1]
+        dst = self._mv
+        stride = self._pitch
+        w = self.width
+        for x0, y0, x1, y1 in rects:
+            if x0 == 0 and x1 == w:
+                dst[y0 * stride:y1 * stride] = src[y0 * stride:y1 * stride]
+            else:
+                a = (x0 & ~1) * stride // w
+                b = ((x1 + 1) & ~1) * stride // w
+                for y in range(y0 * stride, y1 * stride, stride):
+                    dst[y + a:y + b] = src[y + a:y + b]
+
+    def blit_raw_image(self, filename, x=0, y=0, w=None, h=None, clip=None,
+                       direct=False):
+        """Draw a big-endian RGB565 .raw file at (x, y), see blit_raw().
+
+        Without w the image is taken to be square; without h it is worked
+        out from the file size.
+        """
         try:
             with open(filename, "rb") as f:
-                for y in range(self.height):
-                    row = f.read(self.width * 2)  # 2 bytes per pixel (RGB565)
-                    if not row:
-                        break
-                    self.write_cmd(0x2A)
-                    self.write_data(0x00)
-                    self.write_data(0x00)
-                    self.write_data(0x00)
-                    self.write_data(self.width - 1)
-
-                    self.write_cmd(0x2B)
-                    self.write_data(0x00)
-                    self.write_data(y)
-                    self.write_data(0x00)
-                    self.write_data(y)
-
-                    self.write_cmd(0x2C)
-                    self.cs(1)
-                    self.dc(1)
-                    self.cs(0)
-                    self.spi.write(row)
-                    self.cs(1)
+                size = f.seek(0, 2) // 2
+                if w is None:
+                    w = int(size ** 0.5)
+                if h is None:
+                    h = size // w
+                self.blit_raw(f, x, y, w, h, clip, 0, direct)
             print("Image loaded:", filename)
         except Exception as e:
             print("Failed to load image:", e)
-            
-    def fill(self, color):
-        self.write_cmd(0x2A)
-        self.write_data(0x00)
-        self.write_data(0x00)
-        self.write_data((self.width - 1) >> 8)
-        self.write_data((self.width - 1) & 0xFF)
-
-        self.write_cmd(0x2B)
-        self.write_data(0x00)
-        self.write_data(0x00)
-        self.write_data((self.height - 1) >> 8)
-        self.write_data((self.height - 1) & 0xFF)
-
-        self.write_cmd(0x2C)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        
-        # Fill with color - one line at a time
-        self.fill_rect(0, 0, self.width, self.height, color)
-        self.cs(1)
 
-    def fill_rect(self, x, y, w, h, color):
-        """Fill a rectangle with the specified color."""
-        # Clip to display bounds
-        x = max(0, min(x, self.width - 1))
-        y = max(0, min(y, self.height - 1))
-        w = min(w, self.width - x)
-        h = min(h, self.height - y)
-        
-        if w <= 0 or h <= 0:
+    def blit_raw(self, f, x, y, w, h, clip=None, offset=0, direct=False):
+        """Draw a w x h big-endian RGB565 image at (x, y) from the open file f.
+
+        The pixels start at offset in the file. clip=(x, y, w, h) limits
+        drawing to that screen rectangle. Rows are read straight into the
+        buffer with readinto; only rows of the current band are read. In the
+        indexed modes, or with direct=True, the visible part is instead
+        streamed through one panel window in reads of self.chunk bytes,
+        which leaves the buffer and its dirty regions untouched.
+        """
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if clip is not None:
+            x0 = max(x0, clip[0])
+            y0 = max(y0, clip[1])
+            x1 = min(x1, clip[0] + clip[2])
+            y1 = min(y1, clip[1] + clip[3])
+        if not direct and self.lut is None:
+            y0 = max(y0, self._oy)
+            y1 = min(y1, self._oy + self.lines)
+        if x0 >= x1 or y0 >= y1:
             return
-            
-        # Prepare color bytes (RGB565 format)
-        color_hi = (color >> 8) & 0xFF
-        color_lo = color & 0xFF
-        
-        # Set the window to the rectangle
-        self.write_cmd(0x2A)
-        self.write_data(x >> 8)
-        self.write_data(x & 0xFF)
-        self.write_data(((x + w - 1) >> 8) & 0xFF)
-        self.write_data((x + w - 1) & 0xFF)
-        
-        self.write_cmd(0x2B)
-        self.write_data(y >> 8)
-        self.write_data(y & 0xFF)
-        self.write_data(((y + h - 1) >> 8) & 0xFF)
-        self.write_data((y + h - 1) & 0xFF)
-        
-        # Fill the rectangle
-        self.write_cmd(0x2C)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        
-        # Fill one line at a time
-        for _ in range(h):
-            # Fill one line with the color
-            color_bytes = bytearray([color_hi, color_lo] * w)
-            self.spi.write(color_bytes)
-        
-        self.cs(1)
-    
-    def rect(self, x, y, w, h, color):
-        # Top and bottom
-        for i in range(w):
-            self.draw_pixel(x + i, y, color)
-            self.draw_pixel(x + i, y + h - 1, color)
-        # Left and right
-        for i in range(h):
-            self.draw_pixel(x, y + i, color)
-            self.draw_pixel(x + w - 1, y + i, color)
+        rowbytes = w * 2
+        n = (x1 - x0) * 2  # Visible bytes per row
+        pos = offset + (y0 - y) * rowbytes + (x0 - x) * 2
+        f.seek(pos)
+        if not direct and self.lut is None:
+            pitch = self._pitch
+            mv = self._mv
+            dst = (y0 - self._oy) * pitch + x0 * 2
+            if n == rowbytes == pitch:
+                f.readinto(mv[dst:dst + n * (y1 - y0)])
+            else:
+                for _ in range(y1 - y0):
+                    if n != rowbytes:
+                        f.seek(pos)
+                        pos += rowbytes
+                    f.readinto(mv[dst:dst + n])
+                    dst += pitch
+            self.mark_dirty(x0, y0, x1 - x0, y1 - y0)
+            return
+        buf = self._chunk_buf
+        if buf is None or len(buf) < max(self.chunk, n):
+            buf = self._chunk_buf = memoryview(bytearray(max(self.chunk, n)))
+        bus = self.bus
+        bus.begin(x0, y0, x1 - 1, y1 - 1)
+        if n == rowbytes:
+            # Whole rows: the visible block is contiguous in the file
+            left = n * (y1 - y0)
+            size = len(buf)
+            while left:
+                k = min(size, left)
+                f.readinto(buf[:k])
+                bus.write(buf[:k])
+                left -= k
+        else:
+            rows = len(buf) // n
+            y = y0
+            while y < y1:
+                k = min(rows, y1 - y)
+                o = 0
+                for _ in range(k):
+                    f.seek(pos)
+                    f.readinto(buf[o:o + n])
+                    pos += rowbytes
+                    o += n
+                bus.write(buf[:o])
+                y += k
+        bus.end()
+
+    def blit_rle565(self, f, x, y, offset=0, clip=None, direct=False):
+        """Draw an RLE565 image at (x, y) from the open file f.
+
+        Like blit_raw(), but rows are decoded one at a time: straight into
+        the buffer, or with direct=True (and in the indexed modes) into a
+        row buffer streamed through one panel window. Rows above the
+        visible area are skipped by seeking.
+        """
+        dec = Decoder(f, offset)
+        w = dec.width
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + dec.height, self.height)
+        if clip is not None:
+            x0 = max(x0, clip[0])
+            y0 = max(y0, clip[1])
+            x1 = min(x1, clip[0] + clip[2])
+            y1 = min(y1, clip[1] + clip[3])
+        to_buffer = not direct and self.lut is None
+        if to_buffer:
+            y0 = max(y0, self._oy)
+            y1 = min(y1, self._oy + self.lines)
+        if x0 >= x1 or y0 >= y1:
+            return
+        dec.skip(y0 - y)
+        skip = (x0 - x) * 2
+        n = (x1 - x0) * 2
+        buf = self._chunk_buf
+        if buf is None or len(buf) < max(self.chunk, w * 2):
+            buf = self._chunk_buf = memoryview(bytearray(max(self.chunk, w * 2)))
+        row = buf[:w * 2]
+        if to_buffer:
+            pitch = self._pitch
+            mv = self._mv
+            dst = (y0 - self._oy) * pitch + x0 * 2
+            for _ in range(y1 - y0):
+                if n == w * 2:
+                    dec.readrow(mv[dst:dst + n])
+                else:
+                    dec.readrow(row)
+                    mv[dst:dst + n] = row[skip:skip + n]
+                dst += pitch
+            self.mark_dirty(x0, y0, x1 - x0, y1 - y0)
+            return
+        bus = self.bus
+        bus.begin(x0, y0, x1 - 1, y1 - 1)
+        for _ in range(y1 - y0):
+            dec.readrow(row)
+            bus.write(row[skip:skip + n])
+        bus.end()
+
+    def blit_scaled(self, src, x, y, w, h, dw=None, dh=None, rotate=0, offset=0):
+        """Draw a w x h big-endian RGB565 image into the buffer, scaled and rotated.
+
+        src is a buffer or an open file (pixels from offset). The image is
+        rotated clockwise by rotate degrees (0, 90, 180 or 270) and scaled,
+        nearest neighbour, to dw x dh on screen; by default its rotated
+        size. Source pixels are picked through index tables built once per
+        call, one source row at a time: a row of the output at 0 and 180
+        degrees, a column at 90 and 270. A file is read one row per use.
+        """
+        if self.lut is not None:
+            raise ValueError("blit_scaled needs mode RGB565")
+        if rotate not in (0, 90, 180, 270):
+            raise ValueError("rotate must be 0, 90, 180 or 270")
+        turned = rotate == 90 or rotate == 270
+        rw, rh = (h, w) if turned else (w, h)
+        dw = rw if dw is None else dw
+        dh = rh if dh is None else dh
+        x0 = max(x, 0)
+        y0 = max(y, self._oy)
+        x1 = min(x + dw, self.width)
+        y1 = min(y + dh, self._oy + self.lines)
+        if x0 >= x1 or y0 >= y1:
+            return
+        # Nearest rotated-space coordinate of each screen column and row
+        us = [((2 * (i - x) + 1) * rw) // (2 * dw) for i in range(x0, x1)]
+        vs = [((2 * (j - y) + 1) * rh) // (2 * dh) for j in range(y0, y1)]
+        # Output lines run along one source row: screen rows when upright,
+        # screen columns when turned. For each line: the source row, and
+        # per pixel the source column
+        if rotate == 0:
+            rows, cols = vs, us
+        elif rotate == 180:
+            rows = [h - 1 - v for v in vs]
+            cols = [w - 1 - u for u in us]
+        elif rotate == 90:
+            rows = [h - 1 - u for u in us]
+            cols = vs
+        else:
+            rows, cols = us, [w - 1 - v for v in vs]
+        tab = array("H", cols)
+        n = len(cols)
+        pitch = self._pitch
+        mv = self._mv
+        start = (y0 - self._oy) * pitch + x0 * 2
+        if turned:
+            line_step = 2
+            packed = n | (pitch // 2) << 12  # Down a column
+        else:
+            line_step = pitch
+            packed = n | 1 << 12
+        rowbytes = w * 2
+        f = src if hasattr(src, "readinto") else None
+        if f is None:
+            src = memoryview(src)
+        else:
+            buf = self._chunk_buf
+            if buf is None or len(buf) < max(self.chunk, rowbytes):
+                buf = self._chunk_buf = memoryview(bytearray(max(self.chunk, rowbytes)))
+            row = buf[:rowbytes]
+        last = -1
+        for sy in rows:
+            if f is None:
+                line = src[offset + sy * rowbytes:]
+            else:
+                if sy != last:  # Neighbouring lines often share a source row
+                    f.seek(offset + sy * rowbytes)
+                    f.readinto(row)
+                    last = sy
+                line = row
+            _gather(line, mv[start:], tab, packed)
+            start += line_step
+        self.mark_dirty(x0, y0, x1 - x0, y1 - y0)
 
     def draw_pixel(self, x, y, color):
-        self.write_cmd(0x2A)
-        self.write_data(x >> 8)
-        self.write_data(x & 0xFF)
-        self.write_data(x >> 8)
-        self.write_data(x & 0xFF)
-
-        self.write_cmd(0x2B)
-        self.write_data(y >> 8)
-        self.write_data(y & 0xFF)
-        self.write_data(y >> 8)
-        self.write_data(y & 0xFF)
-
-        self.write_cmd(0x2C)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(bytearray([color >> 8, color & 0xFF]))
-        self.cs(1)
-        
-    def draw_char(self, ch, x, y, color):
-        glyph = font.get(ch.upper(), font[' '])
-        for row_idx, row in enumerate(glyph):
-            for col in range(8):
-                if (row >> (7 - col)) & 1:
-                    self.draw_pixel(x + col, y + row_idx, color)
+        self.pixel(x, y, color)
 
     def draw_text(self, text, x, y, color):
-        for i, ch in enumerate(text):
-            self.draw_char(ch, x + i * 8, y, color)
+        self.text(text, x, y, color)
@@ -0,0 +1,300 @@
+# lcdbus.py Shared SPI transport for the ST7789 panel drivers.
+#
+# Every command goes out together with its whole parameter block in a single
+# CS-low burst, and window setup (CASET + RASET + RAMWR) is one burst encoded
+# into preallocated buffers, so drawing does not allocate per byte.
+#
+# Large transfers can run in the background: flush_async() hands the buffer
+# to a flush engine and returns. On the RP2040 the engine is an rp2.DMA
+# channel feeding the SPI TX FIFO; elsewhere SyncFlush completes the write
+# before returning, and SimFlush stands in on the host by modelling the
+# transfer time at a given baud rate.
+
+import time
+
+try:
+    from micropython import const
+except ImportError:  # CPython host
+    def const(x):
+        return x
+
+try:
+    from time import ticks_us, ticks_diff, ticks_add, sleep_ms
+except ImportError:  # CPython host
+    def ticks_us():
+        return int(time.perf_counter() * 1_000_000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def ticks_add(a, b):
+        return a + b
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+try:
+    from rp2 import DMA
+    from machine import mem32
+except ImportError:
+    DMA = None
+
+# RP2040 PL022 SPI registers
+_SPI0_BASE = 0x4003C000  # Above the small-int range, so not const()
+_SPI1_BASE = 0x40040000
+_SSPDR = const(0x08)
+_SSPSR = const(0x0C)
+_SSPICR = const(0x20)
+_SSPDMACR = const(0x24)
+_SSPSR_RNE = const(0x04)
+_SSPSR_BSY = const(0x10)
+_SSPICR_RORIC = const(0x01)
+_SSPDMACR_TXDMAE = const(0x02)
+_DREQ_SPI0_TX = const(16)
+_DREQ_SPI1_TX = const(18)
+
+_CMD_CASET = b"\x2a"
+_CMD_RASET = b"\x2b"
+_CMD_RAMWR = b"\x2c"
+
+# Waveshare Pico-LCD-1.3 power-up sequence as (command, parameters, delay_ms)
+INIT_1INCH3 = (
+    (0x36, b"\x70", 0),                  # MADCTL
+    (0x3A, b"\x05", 0),                  # COLMOD: 16 bit/pixel
+    (0xB2, b"\x0c\x0c\x00\x33\x33", 0),  # Porch control
+    (0xB7, b"\x35", 0),                  # Gate control
+    (0xBB, b"\x19", 0),                  # VCOM
+    (0xC0, b"\x2c", 0),                  # LCM control
+    (0xC2, b"\x01", 0),                  # VDV/VRH enable
+    (0xC3, b"\x12", 0),                  # VRH
+    (0xC4, b"\x20", 0),                  # VDV
+    (0xC6, b"\x0f", 0),                  # Frame rate
+    (0xD0, b"\xa4\xa1", 0),              # Power control
+    (0xE0, b"\xd0\x04\x0d\x11\x13\x2b\x3f\x54\x4c\x18\x0d\x0b\x1f\x23", 0),
+    (0xE1, b"\xd0\x04\x0c\x11\x13\x2c\x3f\x44\x51\x2f\x1f\x1f\x20\x23", 0),
+    (0x21, None, 0),                     # Inversion on
+    (0x11, None, 120),                   # Sleep out
+    (0x29, None, 0),                     # Display on
+)
+
+
+def _nop(_):
+    pass
+
+
+class SyncFlush:
+    """Fallback engine: the transfer is complete when start() returns."""
+
+    def __init__(self, spi):
+        self.spi = spi
+
+    def start(self, buf):
+        self.spi.write(buf)
+
+    def busy(self):
+        return False
+
+    def finish(self):
+        pass
+
+
+class SimFlush(SyncFlush):
+    """Host stand-in: writes at once but stays busy for the time the
+    transfer would take at baudrate, so pipelining can be exercised."""
+
+    def __init__(self, spi, baudrate=62_500_000):
+        super().__init__(spi)
+        self.baudrate = baudrate
+        self._done = ticks_us()
+
+    def start(self, buf):
+        self.spi.write(buf)
+        self._done = ticks_add(ticks_us(), len(buf) * 8_000_000 // self.baudrate)
+
+    def busy(self):
+        return ticks_diff(self._done, ticks_us()) > 0
+
+
+class DMAFlush:
+    """RP2040 engine: an rp2.DMA channel paced by the SPI TX DREQ."""
+
+    def __init__(self, spi_id=1):
+        base = _SPI1_BASE if spi_id else _SPI0_BASE
+        self._dr = base + _SSPDR
+        self._sr = base + _SSPSR
+        self._icr = base + _SSPICR
+        mem32[base + _SSPDMACR] = mem32[base + _SSPDMACR] | _SSPDMACR_TXDMAE
+        self._dma = DMA()
+        self._ctrl = self._dma.pack_ctrl(
+            size=0, inc_read=True, inc_write=False,
+            treq_sel=_DREQ_SPI1_TX if spi_id else _DREQ_SPI0_TX,
+        )
+        self._buf = None
+
+    def start(self, buf):
+        self._buf = buf  # Keep the source alive while DMA reads it
+        self._dma.config(read=buf, write=self._dr, count=len(buf),
+                         ctrl=self._ctrl, trigger=True)
+
+    def busy(self):
+        # BSY covers both a non-empty TX FIFO and the frame being shifted out
+        return self._dma.active() or mem32[self._sr] & _SSPSR_BSY
+
+    def finish(self):
+        # Discard what was clocked in meanwhile and clear the overrun flag
+        while mem32[self._sr] & _SSPSR_RNE:
+            mem32[self._dr]
+        mem32[self._icr] = _SSPICR_RORIC
+        self._buf = None
+
+
+class LCDBus:
+    def __init__(self, spi, cs, dc, rst=None, spi_id=1, flush=None):
+        self.spi = spi
+        self.cs = _nop if cs is None else cs
+        self.dc = dc
+        self.rst = rst
+        self.spi_id = spi_id
+        self._flush = flush  # Created on first flush_async() unless given
+        self._pending = False
+        self._cmd = bytearray(1)
+        self._caset = bytearray(4)
+        self._raset = bytearray(4)
+        self._pixel = bytearray(2)
+        self.cs(1)
+
+    def reset(self):
+        if self.rst is None:
+            return
+        self.rst(1)
+        sleep_ms(10)
+        self.rst(0)
+        sleep_ms(10)
+        self.rst(1)
+        sleep_ms(120)
+
+    def run(self, table):
+        """Send an init table of (command, parameters, delay_ms) entries."""
+        for cmd, data, delay in table:
+            self.command(cmd, data)
+            if delay:
+                sleep_ms(delay)
+
+    def command(self, cmd, data=None):
+        """Send a command and its parameter block in one CS-low burst."""
+        if self._pending:
+            self.wait_flush()
+        self._cmd[0] = cmd
+        self.cs(0)
+        self.dc(0)
+        self.spi.write(self._cmd)
+        if data:
+            self.dc(1)
+            self.spi.write(data)
+        self.cs(1)
+
+    def data(self, buf):
+        """Send a block of data in one CS-low burst."""
+        if self._pending:
+            self.wait_flush()
+        self.cs(0)
+        self.dc(1)
+        self.spi.write(buf)
+        self.cs(1)
+
+    def begin(self, x0, y0, x1, y1):
+        """Open a RAMWR window with inclusive corners and leave CS low.
+
+        Pixel data follows through write() and the burst is closed by end().
+        """
+        if self._pending:
+            self.wait_flush()
+        c = self._caset
+        c[0] = x0 >> 8
+        c[1] = x0 & 0xFF
+        c[2] = x1 >> 8
+        c[3] = x1 & 0xFF
+        r = self._raset
+        r[0] = y0 >> 8
+        r[1] = y0 & 0xFF
+        r[2] = y1 >> 8
+        r[3] = y1 & 0xFF
+        spi = self.spi
+        dc = self.dc
+        self.cs(0)
+        dc(0)
+        spi.write(_CMD_CASET)
+        dc(1)
+        spi.write(c)
+        dc(0)
+        spi.write(_CMD_RASET)
+        dc(1)
+        spi.write(r)
+        dc(0)
+        spi.write(_CMD_RAMWR)
+        dc(1)
+
+    def write(self, buf):
+        self.spi.write(buf)
+
+    def end(self):
+        self.cs(1)
+
+    def window(self, x0, y0, x1, y1):
+        """Set the RAMWR window; data may follow in later bursts."""
+        self.begin(x0, y0, x1, y1)
+        self.cs(1)
+
+    def blit(self, x0, y0, x1, y1, buf):
+        """Write buf into the window with inclusive corners in one burst."""
+        self.begin(x0, y0, x1, y1)
+        self.spi.write(buf)
+        self.cs(1)
+
+    def pixel(self, x, y, color):
+        p = self._pixel
+        p[0] = color >> 8
+        p[1] = color & 0xFF
+        self.blit(x, y, x, y, p)
+
+    # ---------- Background transfers ----------
+
+    def _engine(self):
+        if self._flush is None:
+            self._flush = SyncFlush(self.spi)
+            if DMA is not None:
+                try:
+                    self._flush = DMAFlush(self.spi_id)
+                except (OSError, ValueError):  # No free channel
+                    pass
+        return self._flush
+
+    def flush_async(self, x0, y0, x1, y1, buf):
+        """Start writing buf into the window and return without waiting.
+
+        buf must stay untouched until is_busy() is False or wait_flush()
+        returns.
+        """
+        engine = self._engine()
+        self.begin(x0, y0, x1, y1)
+        engine.start(buf)
+        self._pending = True
+
+    def is_busy(self):
+        if self._pending:
+            if self._flush.busy():
+                return True
+            self._complete()
+        return False
+
+    def wait_flush(self):
+        if self._pending:
+            busy = self._flush.busy
+            while busy():
+                pass
+            self._complete()
+
+    def _complete(self):
+        self._flush.finish()
+        self._pending = False
+        self.cs(1)
@@ -0,0 +1,120 @@
+# rle565.py Run-length coded RGB565 images, decoded row by row.
+#
+# UI art is mostly flat areas, which a run-length code shrinks well and
+# decodes with a few slice copies per row: faster than reading the raw
+# pixels from flash. Layout, integers little-endian:
+#
+#   header  magic b"R565", u16 width, u16 height
+#   rows    u16 coded length, then packets:
+#             0x00-0x7F  literal: 1-128 big-endian pixels follow
+#             0x80-0xFF  run: one pixel follows, repeated 1-128 times
+#
+# The length prefix lets readers skip rows (clipping, bands) with a seek.
+# encode() is shared with the host converter.
+
+import struct
+
+HEADER = "<4sHH"
+MAGIC = b"R565"
+_MAX_PACKET = 128
+
+
+def max_row_bytes(width):
+    """Largest coded size of a row of width pixels."""
+    return width * 2 + (width + _MAX_PACKET - 1) // _MAX_PACKET
+
+
+def decode_row(src, n, dst):
+    """Expand n coded bytes from src into the RGB565 row dst."""
+    i = 0
+    o = 0
+    while i < n:
+        c = src[i]
+        if c & 0x80:
+            end = o + ((c & 0x7F) + 1) * 2
+            dst[o] = src[i + 1]
+            dst[o + 1] = src[i + 2]
+            filled = o + 2
+            while filled < end:  # Double the run until it is complete
+                step = min(filled - o, end - filled)
+                dst[filled:filled + step] = dst[o:o + step]
+                filled += step
+            o = end
+            i += 3
+        else:
+            k = (c + 1) * 2
+            dst[o:o + k] = src[i + 1:i + 1 + k]
+            o += k
+            i += 1 + k
+
+
+class Decoder:
+    """Reads an RLE565 image from an open file, one row at a time."""
+
+    def __init__(self, f, offset=0):
+        f.seek(offset)
+        magic, w, h = struct.unpack(HEADER, f.read(struct.calcsize(HEADER)))
+        if magic != MAGIC:
+            raise ValueError("Not an RLE565 image")
+        self._f = f
+        self.width = w
+        self.height = h
+        self.row = 0  # Next row to be read
+        self._len = bytearray(2)
+        self._src = memoryview(bytearray(max_row_bytes(w)))
+
+    def _length(self):
+        self._f.readinto(self._len)
+        return self._len[0] | self._len[1] << 8
+
+    def readrow(self, dst):
+        """Decode the next row into dst, a buffer of width * 2 bytes."""
+        n = self._length()
+        src = self._src
+        self._f.readinto(src[:n])
+        decode_row(src, n, dst)
+        self.row += 1
+
+    def skip(self, rows):
+        f = self._f
+        for _ in range(rows):
+            f.seek(self._length(), 1)
+        self.row += rows
+
+
+def _encode_row(row, w):
+    out = bytearray()
+    i = 0
+    lit = 0  # Start of the pending literal, in pixels
+    while i < w:
+        p = row[2 * i:2 * i + 2]
+        j = i + 1
+        while j < w and j - i < _MAX_PACKET and row[2 * j:2 * j + 2] == p:
+            j += 1
+        if j - i >= 2:
+            _literals(out, row, lit, i)
+            out.append(0x80 | (j - i - 1))
+            out.extend(p)
+            lit = j
+        i = j
+    _literals(out, row, lit, w)
+    return out
+
+
+def _literals(out, row, a, b):
+    while a < b:
+        k = min(b - a, _MAX_PACKET)
+        out.append(k - 1)
+        out.extend(row[2 * a:2 * (a + k)])
+        a += k
+
+
+def encode(data, w, h):
+    """Encode big-endian RGB565 pixel data of a w x h image."""
+    out = bytearray(struct.pack(HEADER, MAGIC, w, h))
+    stride = w * 2
+    for y in range(h):
+        row = _encode_row(data[y * stride:(y + 1) * stride], w)
+        out.extend(struct.pack("<H", len(row)))
+        out.extend(row)
+    return bytes(out)
@@ -1,6 +1,10 @@
 import time
+import framebuf
 from micropython import const
+from uctypes import bytearray_at, addressof
 import ustruct as struct
+from lcdbus import LCDBus
+import blend
 
 # commands
 ST77XX_NOP = const(0x00)
@@ -23,6 +27,10 @@ ST77XX_RAMWR = const(0x2C)
 ST77XX_RAMRD = const(0x2E)
 
 ST77XX_PTLAR = const(0x30)
+ST77XX_VSCRDEF = const(0x33)
+ST77XX_VSCSAD = const(0x37)
+ST77XX_IDMOFF = const(0x38)
+ST77XX_IDMON = const(0x39)
 ST77XX_COLMOD = const(0x3A)
 ST7789_MADCTL = const(0x36)
 
@@ -60,7 +68,18 @@ _ENCODE_PIXEL = ">H"
 _ENCODE_POS = ">HH"
 _DECODE_PIXEL = ">BBB"
 
-_BUFFER_SIZE = const(256)
+_BUFFER_SIZE = const(2048)  # Default fill budget in bytes
+_PATTERN_SLOTS = const(4)    # Colors kept in the fill pattern cache
+
+# Power states
+POWER_FULL = const(0)
+POWER_PARTIAL = const(1)  # Partial area only, 8-color idle mode
+POWER_SLEEP = const(2)
+
+_SLEEP_SETTLE_MS = const(5)    # No commands this soon after SLPIN/SLPOUT
+_SLEEP_TOGGLE_MS = const(120)  # Minimum time between SLPIN and SLPOUT
+
+_GATE_LINES = const(320)  # Frame memory rows
 
 
 def delay_ms(ms):
@@ -80,7 +99,7 @@ def color565(r, g=0, b=0):
 
 class ST77xx:
     def __init__(self, spi, width, height, reset, dc, cs=None, backlight=None,
-                 xstart=-1, ystart=-1):
+                 xstart=-1, ystart=-1, buffer_size=_BUFFER_SIZE):
         """
         display = st7789.ST7789(
             SPI(1, baudrate=40000000, phase=0, polarity=1),
@@ -89,6 +108,9 @@ class ST77xx:
             dc=machine.Pin(2, machine.Pin.OUT),
         )
 
+        buffer_size is the RAM in bytes that fills may use. It is split
+        between the cached color patterns, so a larger budget means longer
+        chunks per SPI write.
         """
         self.width = width
         self.height = height
@@ -100,6 +122,16 @@ class ST77xx:
         self.dc = dc
         self.cs = cs
         self.backlight = backlight
+        self.bus = LCDBus(self.spi, cs, dc)
+        self.power = POWER_FULL
+        self._sleep_ticks = None  # When the last SLPIN/SLPOUT was sent
+        self._settling = False
+        # Most recently used first: [(color, memoryview), ...]
+        self._patterns = []
+        self._pattern_len = max(2, buffer_size // _PATTERN_SLOTS & ~1)
+        # Text is rendered into a line buffer that only grows when needed
+        self._text_buf = bytearray(0)
+        self._text_pal = framebuf.FrameBuffer(bytearray(4), 2, 1, framebuf.RGB565)
         if xstart >= 0 and ystart >= 0:
             self.xstart = xstart
             self.ystart = ystart
@@ -137,16 +169,22 @@ class ST77xx:
         if self.cs:
             self.cs.on()
 
+    def _settle(self):
+        # Called before anything goes out on the bus: the controller takes
+        # no commands for 5 ms after SLPIN/SLPOUT.
+        if self._settling:
+            left = _SLEEP_SETTLE_MS - self._since_sleep_change()
+            if left > 0:
+                delay_ms(left)
+            self._settling = False
+
     def write(self, command=None, data=None):
         """SPI write to the device: commands and data"""
-        self.cs_low()
+        self._settle()
         if command is not None:
-            self.dc_low()
-            self.spi.write(bytes([command]))
-        if data is not None:
-            self.dc_high()
-            self.spi.write(data)
-        self.cs_high()
+            self.bus.command(command, data)
+        elif data is not None:
+            self.bus.data(data)
 
     def hard_reset(self):
         self.cs_low()
@@ -162,11 +200,88 @@ class ST77xx:
         self.write(ST77XX_SWRESET)
         delay_ms(150)
 
-    def sleep_mode(self, value):
+    def _since_sleep_change(self):
+        if self._sleep_ticks is None:
+            return _SLEEP_TOGGLE_MS
+        return time.ticks_diff(time.ticks_ms(), self._sleep_ticks)
+
+    def sleep_ready(self):
+        """True once another sleep transition may be sent."""
+        return self._since_sleep_change() >= _SLEEP_TOGGLE_MS
+
+    def sleep_mode(self, value, wait=False):
+        """Enter (True) or leave (False) sleep.
+
+        The controller needs 120 ms between transitions. When that has not
+        passed yet this sends nothing and returns False, so an input loop
+        can poll sleep_ready() and try again; wait=True waits for the
+        remainder instead. The 5 ms settle time after a transition is only
+        waited for if another command follows that soon.
+        """
+        left = _SLEEP_TOGGLE_MS - self._since_sleep_change()
+        if left > 0:
+            if not wait:
+                return False
+            delay_ms(left)
         if value:
             self.write(ST77XX_SLPIN)
         else:
             self.write(ST77XX_SLPOUT)
+        self._sleep_ticks = time.ticks_ms()
+        self._settling = True
+        return True
+
+    def partial_mode(self, y0, y1):
+        """Refresh rows y0..y1 only; the rest of the panel is blanked."""
+        self.write(ST77XX_PTLAR, self._encode_pos(y0 + self.ystart, y1 + self.ystart))
+        self.write(ST77XX_PTLON)
+
+    def normal_mode(self):
+        self.write(ST77XX_NORON)
+
+    def idle_mode(self, value):
+        """8-color mode: each channel is on or off, saving panel power."""
+        if value:
+            self.write(ST77XX_IDMON)
+        else:
+            self.write(ST77XX_IDMOFF)
+
+    def power_mode(self, mode, y0=0, y1=None, wait=False):
+        """Switch to POWER_FULL, POWER_PARTIAL or POWER_SLEEP.
+
+        POWER_PARTIAL refreshes rows y0..y1 in idle mode, e.g. a clock strip
+        on an always-on unit. Returns False, changing nothing, while a sleep
+        transition is not allowed yet, unless wait is True.
+        """
+        if mode == self.power:
+            return True
+        if mode == POWER_SLEEP:
+            if not self.sleep_mode(True, wait):
+                return False
+        else:
+            waking = self.power == POWER_SLEEP
+            if waking and not wait and not self.sleep_ready():
+                return False
+            # The controller takes these while asleep, so SLPOUT goes last
+            # and its settle time falls on the next drawing command
+            if mode == POWER_PARTIAL:
+                self.partial_mode(y0, self.height - 1 if y1 is None else y1)
+                self.idle_mode(True)
+            else:
+                self.idle_mode(False)
+                self.normal_mode()
+            if waking:
+                self.sleep_mode(False, True)
+        self.power = mode
+        return True
+
+    def wake(self, wait=False):
+        """Back to full power, e.g. from the input handler on any key.
+
+        Returns False within 120 ms of going to sleep; call again once
+        sleep_ready() is True. Nothing here blocks unless wait is True.
+        """
+        return self.power_mode(POWER_FULL, wait=wait)
 
     def inversion_mode(self, value):
         if value:
@@ -174,13 +289,28 @@ class ST77xx:
         else:
             self.write(ST77XX_INVOFF)
 
+    def vscrdef(self, tfa=0, vsa=None, bfa=None):
+        """Define the vertical scroll area as tfa fixed top lines, vsa
+        scrolling lines and bfa fixed bottom lines (320 in total). By
+        default the whole panel scrolls. The lines are the panel's gate
+        lines, so in rotations 4-7 (MADCTL MV) content moves sideways."""
+        if vsa is None:
+            vsa = self.height - tfa
+        if bfa is None:
+            bfa = _GATE_LINES - tfa - vsa
+        self.write(ST77XX_VSCRDEF, struct.pack(">HHH", tfa, vsa, bfa))
+
+    def vscsad(self, line):
+        """Set the frame memory line shown at the top of the scroll area."""
+        self.write(ST77XX_VSCSAD, struct.pack(">H", line))
+
     def _set_color_mode(self, mode):
         self.write(ST77XX_COLMOD, bytes([mode & 0x77]))
 
     def init(self, *args, **kwargs):
         self.hard_reset()
         self.soft_reset()
-        self.sleep_mode(False)
+        self.sleep_mode(False, True)
 
     def _set_mem_access_mode(self, rotation, vert_mirror, horz_mirror, is_bgr):
         rotation &= 7
@@ -227,9 +357,9 @@ class ST77xx:
         self.write(ST77XX_RASET, self._encode_pos(start, end))
 
     def set_window(self, x0, y0, x1, y1):
-        self._set_columns(x0, x1)
-        self._set_rows(y0, y1)
-        self.write(ST77XX_RAMWR)
+        self._settle()
+        self.bus.window(x0 + self.xstart, y0 + self.ystart,
+                        x1 + self.xstart, y1 + self.ystart)
 
     def vline(self, x, y, length, color):
         self.fill_rect(x, y, 1, length, color)
@@ -238,12 +368,14 @@ class ST77xx:
         self.fill_rect(x, y, length, 1, color)
 
     def pixel(self, x, y, color):
-        self.set_window(x, y, x, y)
-        self.write(None, self._encode_pixel(color))
+        self._settle()
+        self.bus.pixel(x + self.xstart, y + self.ystart, color)
 
     def blit_buffer(self, buffer, x, y, width, height):
-        self.set_window(x, y, x + width - 1, y + height - 1)
-        self.write(None, buffer)
+        x += self.xstart
+        y += self.ystart
+        self._settle()
+        self.bus.blit(x, y, x + width - 1, y + height - 1, buffer)
 
     def rect(self, x, y, w, h, color):
         self.hline(x, y, w, color)
@@ -251,48 +383,274 @@ class ST77xx:
         self.vline(x + w - 1, y, h, color)
         self.hline(x, y + h - 1, w, color)
 
+    def _pattern(self, color):
+        """Return a buffer of repeated pixels in color, cached per color."""
+        patterns = self._patterns
+        for i in range(len(patterns)):
+            entry = patterns[i]
+            if entry[0] == color:
+                if i:
+                    patterns.pop(i)
+                    patterns.insert(0, entry)
+                return entry[1]
+        if len(patterns) >= _PATTERN_SLOTS:
+            buf = patterns.pop()[1]  # Reuse the least recently used buffer
+        else:
+            buf = memoryview(bytearray(self._pattern_len))
+        n = len(buf)
+        buf[0] = color >> 8
+        buf[1] = color & 0xFF
+        filled = 2
+        while filled < n:  # Double the filled part until the buffer is full
+            step = min(filled, n - filled)
+            buf[filled:filled + step] = buf[:step]
+            filled += step
+        patterns.insert(0, (color, buf))
+        return buf
+
     def fill_rect(self, x, y, width, height, color):
-        self.set_window(x, y, x + width - 1, y + height - 1)
-        chunks, rest = divmod(width * height, _BUFFER_SIZE)
-        pixel = self._encode_pixel(color)
-        self.dc_high()
-        if chunks:
-            data = pixel * _BUFFER_SIZE
-            for _ in range(chunks):
-                self.write(None, data)
-        if rest:
-            self.write(None, pixel * rest)
+        if x < 0:
+            width += x
+            x = 0
+        if y < 0:
+            height += y
+            y = 0
+        width = min(width, self.width - x)
+        height = min(height, self.height - y)
+        if width <= 0 or height <= 0:
+            return
+        x += self.xstart
+        y += self.ystart
+        total = width * height * 2
+        data = self._pattern(color)
+        chunk = len(data)
+        bus = self.bus
+        self._settle()
+        # One window and one CS-low burst for the whole rectangle
+        bus.begin(x, y, x + width - 1, y + height - 1)
+        while total > chunk:
+            bus.write(data)
+            total -= chunk
+        bus.write(data[:total])
+        bus.end()
 
     def fill(self, color):
         self.fill_rect(0, 0, self.width, self.height, color)
 
+    def text(self, s, x, y, color=WHITE, background=BLACK, font=None):
+        """Draw s at x, y and return the width drawn.
+
+        The string is rendered into a reusable RGB565 line buffer and sent
+        in one window. font is a font-to-py module; the default is the 8x8
+        font8x8. Anti-aliased 2- and 4-bit fonts are blended between
+        background and color. Text past the right or bottom edge is clipped.
+        """
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return 0
+        room = self.width - x
+        if font is None:
+            font = _font8x8()
+        height = font.height()
+        bpp = font.bpp() if hasattr(font, "bpp") else 1
+        if bpp == 4:
+            fmt = framebuf.GS4_HMSB
+        elif bpp == 2:
+            fmt = framebuf.GS2_HMSB
+        else:
+            fmt = framebuf.MONO_HMSB if font.reverse() else framebuf.MONO_HLSB
+        width = 0
+        for ch in s:
+            w = font.get_ch(ch)[2]
+            if width + w > room:
+                break
+            width += w
+        if not width:
+            return 0
+        nbytes = width * height * 2
+        if len(self._text_buf) < nbytes:
+            self._text_buf = bytearray(nbytes)
+        fb = framebuf.FrameBuffer(self._text_buf, width, height, framebuf.RGB565)
+        # framebuf stores pixels little-endian, the panel reads big-endian
+        if bpp > 1:
+            # Anti-aliased glyphs: one blended color per coverage level
+            pal = blend.table((color & 0xFF) << 8 | color >> 8,
+                              (background & 0xFF) << 8 | background >> 8, 1 << bpp, True)
+        else:
+            pal = self._text_pal
+            pal.pixel(0, 0, (background & 0xFF) << 8 | background >> 8)
+            pal.pixel(1, 0, (color & 0xFF) << 8 | color >> 8)
+        col = 0
+        for ch in s:
+            data, _, w = font.get_ch(ch)
+            if col + w > width:
+                break
+            buf = bytearray_at(addressof(data), len(data))
+            fb.blit(framebuf.FrameBuffer(buf, w, height, fmt), col, 0, -1, pal)
+            col += w
+        rows = min(height, self.height - y)
+        self.blit_buffer(memoryview(self._text_buf)[:width * rows * 2], x, y, width, rows)
+        return width
+
+    def draw_string(self, s, x, y, color=WHITE, background=BLACK, font=None):
+        return self.text(s, x, y, color, background, font)
+
     def line(self, x0, y0, x1, y1, color):
-        # Line drawing function.  Will draw a single pixel wide line starting at
-        # x0, y0 and ending at x1, y1.
-        steep = abs(y1 - y0) > abs(x1 - x0)
+        """Draw a line as horizontal or vertical runs, one window per run."""
+        dx = abs(x1 - x0)
+        dy = abs(y1 - y0)
+        steep = dy > dx
         if steep:
             x0, y0 = y0, x0
             x1, y1 = y1, x1
+            dx, dy = dy, dx
         if x0 > x1:
             x0, x1 = x1, x0
             y0, y1 = y1, y0
-        dx = x1 - x0
-        dy = abs(y1 - y0)
+        ystep = 1 if y0 < y1 else -1
         err = dx // 2
-        if y0 < y1:
-            ystep = 1
-        else:
-            ystep = -1
-        while x0 <= x1:
-            if steep:
-                self.pixel(y0, x0, color)
-            else:
-                self.pixel(x0, y0, color)
+        start = x0
+        for x in range(x0, x1 + 1):
             err -= dy
-            if err < 0:
+            if err < 0 or x == x1:
+                # The run ends here: the next pixel is on another row
+                if steep:
+                    self.fill_rect(y0, start, 1, x - start + 1, color)
+                else:
+                    self.fill_rect(start, y0, x - start + 1, 1, color)
+                start = x + 1
                 y0 += ystep
                 err += dx
-            x0 += 1
+
+    def circle(self, x, y, r, color, fill=False):
+        self.round_rect(x - r, y - r, 2 * r + 1, 2 * r + 1, r, color, fill)
+
+    def round_rect(self, x, y, w, h, r, color, fill=False):
+        """Draw a rectangle with corners of radius r.
+
+        The corner arcs come from one midpoint octant that is mirrored into
+        horizontal runs near the top and bottom and vertical runs near the
+        sides, so each run costs one window however long it is.
+        """
+        r = max(0, min(r, (w - 1) // 2, (h - 1) // 2))
+        left = x + r
+        right = x + w - 1 - r
+        top = y + r
+        bottom = y + h - 1 - r
+        runs = _octant(r)
+        if fill:
+            # Half width of the arc at each distance from the corner centre
+            ext = bytearray(r + 1) if r < 256 else [0] * (r + 1)
+            for py, a, b in runs:
+                ext[py] = max(ext[py], b)
+                for px in range(a, b + 1):
+                    ext[px] = max(ext[px], py)
+            self.fill_rect(x, top, w, bottom - top + 1, color)
+            t = 1
+            while t <= r:
+                e = ext[t]
+                n = 1
+                while t + n <= r and ext[t + n] == e:
+                    n += 1
+                span = right - left + 2 * e + 1
+                self.fill_rect(left - e, top - t - n + 1, span, n, color)
+                self.fill_rect(left - e, bottom + t, span, n, color)
+                t += n
+            return
+        self.fill_rect(left, y, right - left + 1, 1, color)
+        self.fill_rect(left, y + h - 1, right - left + 1, 1, color)
+        self.fill_rect(x, top, 1, bottom - top + 1, color)
+        self.fill_rect(x + w - 1, top, 1, bottom - top + 1, color)
+        fill_rect = self.fill_rect
+        for py, a, b in runs:
+            a = max(a, 1)  # Column and row 0 belong to the straight edges
+            if a > b:
+                continue
+            n = b - a + 1
+            # Horizontal runs on the top and bottom arcs
+            fill_rect(left - b, top - py, n, 1, color)
+            fill_rect(right + a, top - py, n, 1, color)
+            fill_rect(left - b, bottom + py, n, 1, color)
+            fill_rect(right + a, bottom + py, n, 1, color)
+            # Vertical runs on the side arcs
+            fill_rect(left - py, top - b, 1, n, color)
+            fill_rect(right + py, top - b, 1, n, color)
+            fill_rect(left - py, bottom + a, 1, n, color)
+            fill_rect(right + py, bottom + a, 1, n, color)
+
+    def poly(self, x, y, coords, color, fill=False):
+        """Draw a polygon from flat coords [x0, y0, x1, y1, ...] offset by x, y.
+
+        Filled polygons are scan converted with the even-odd rule into one
+        horizontal run per span.
+        """
+        n = len(coords) // 2
+        if n < 2:
+            return
+        if not fill:
+            px = coords[-2]
+            py = coords[-1]
+            for i in range(0, 2 * n, 2):
+                cx = coords[i]
+                cy = coords[i + 1]
+                self.line(x + px, y + py, x + cx, y + cy, color)
+                px, py = cx, cy
+            return
+        ys = coords[1::2]
+        y0 = max(min(ys), -y)
+        y1 = min(max(ys), self.height - 1 - y)
+        xs = []
+        for row in range(y0, y1 + 1):
+            xs.clear()
+            px = coords[-2]
+            py = coords[-1]
+            for i in range(0, 2 * n, 2):
+                cx = coords[i]
+                cy = coords[i + 1]
+                # Half-open edges so shared vertices are counted once
+                if (py <= row < cy) or (cy <= row < py):
+                    xs.append(px + ((2 * (row - py) + 1) * (cx - px)) // (2 * (cy - py)))
+                px, py = cx, cy
+            xs.sort()
+            for i in range(0, len(xs) - 1, 2):
+                self.fill_rect(x + xs[i], y + row, xs[i + 1] - xs[i] + 1, 1, color)
+
+
+_font = None
+
+
+def _font8x8():
+    """The font8x8 module, imported on first use."""
+    global _font
+    if _font is None:
+        import font8x8
+        _font = font8x8
+    return _font
+
+
+def _octant(r):
+    """Midpoint circle runs for the octant from 12 to half past 1 o'clock.
+
+    Returns (py, a, b): the pixels (a..b, py) offset from the centre.
+    """
+    runs = []
+    px = 0
+    py = r
+    d = 1 - r
+    a = 0
+    while px <= py:
+        npx = px + 1
+        npy = py
+        if d < 0:
+            d += 2 * npx + 1
+        else:
+            npy -= 1
+            d += 2 * (npx - npy) + 1
+        if npy != py or npx > npy:
+            runs.append((py, a, px))
+            a = npx
+        px = npx
+        py = npy
+    return runs
 
 
 class ST7789(ST77xx):
@@ -23,7 +23,6 @@
 
 
 import framebuf
-from uctypes import bytearray_at, addressof
 
 __version__ = (0, 5, 2)
 
@@ -32,6 +31,66 @@ class DisplayState:
     def __init__(self):
         self.text_row = 0
         self.text_col = 0
+        self.vssa = 0  # Frame memory row at the top in hardware scroll mode
+
+
+# A FrameBuffer that knows its size, so buffered drivers can record the
+# area a blit touches.
+class _Glyph(framebuf.FrameBuffer):
+    def __init__(self, buf, width, height, mode):
+        super().__init__(buf, width, height, mode)
+        self.width = width
+        self.height = height
+
+
+# Ready-to-blit glyphs keyed by (font, char, invert), shared by all Writers.
+# Entries are built on first use or by preload(); when the cache is full
+# the oldest entry is dropped.
+class GlyphCache:
+    def __init__(self, size=96):
+        self.size = size
+        self._glyphs = {}
+        self._keys = []  # Insertion order, for eviction
+
+    def get(self, font, char, invert, fmt):
+        key = (font, char, invert)
+        fbc = self._glyphs.get(key)
+        if fbc is None:
+            glyph, char_height, char_width = font.get_ch(char)
+            buf = bytearray(glyph)
+            if invert:
+                for i, v in enumerate(buf):
+                    buf[i] = 0xFF & ~v
+            fbc = _Glyph(buf, char_width, char_height, fmt)
+            if self.size:
+                if len(self._keys) >= self.size:
+                    del self._glyphs[self._keys.pop(0)]
+                self._glyphs[key] = fbc
+                self._keys.append(key)
+        return fbc
+
+    def preload(self, font, chars, invert=False, fmt=framebuf.MONO_HLSB):
+        for char in chars:
+            self.get(font, char, invert, fmt)
+
+    def clear(self):
+        self._glyphs = {}
+        self._keys = []
+
+
+def _bpp(font):
+    # font-to-py fonts are 1-bit; anti-aliased fonts report 2 or 4
+    return font.bpp() if hasattr(font, "bpp") else 1
+
+
+# Width of a glyph less any blank columns on the right, at least 1
+def _inkwidth(glyph, height, width, fmt):
+    fb = framebuf.FrameBuffer(bytearray(glyph), width, height, fmt)
+    for col in range(width - 1, 0, -1):
+        for row in range(height):
+            if fb.pixel(col, row):
+                return col + 1
+    return 1
 
 
 def _get_id(device):
@@ -44,6 +103,9 @@ def _get_id(device):
 class Writer:
 
     state = {}  # Holds a display state for each device
+    glyphs = GlyphCache()  # Replace to change the size limit
+    widths = {}  # (first char, advances, ink widths) for each font
+    _blend = False  # Whether anti-aliased fonts can be drawn
 
     @staticmethod
     def set_textpos(device, row=None, col=None):
@@ -74,6 +136,12 @@ class Writer:
             self.map = framebuf.MONO_HMSB if font.reverse() else framebuf.MONO_HLSB
         else:
             raise ValueError("Font must be horizontally mapped.")
+        self._bpp = _bpp(font)
+        if self._bpp > 1:
+            if not self._blend:
+                raise ValueError("Anti-aliased fonts need CWriter.")
+            self.map = framebuf.GS4_HMSB if self._bpp == 4 else framebuf.GS2_HMSB
+        self._first, self._adv, self._ink = self._widths(font)
         if verbose:
             fstr = "Orientation: Horizontal. Reversal: {}. Width: {}. Height: {}."
             print(fstr.format(font.reverse(), device.width, device.height))
@@ -89,19 +157,45 @@ class Writer:
         self.row_clip = False  # Clip or scroll when screen fullt
         self.col_clip = False  # Clip or new line when row is full
         self.wrap = True  # Word wrap
+        self.hw_scroll = False  # Scroll via the panel's scroll start address
         self.cpos = 0
         self.tab = 4
 
         self.glyph = None  # Current char
         self.char_height = 0
         self.char_width = 0
+        self._linebuf = None  # Composed text row, see _compose()
 
     def _getstate(self):
         return Writer.state[self.devid]
 
+    # Width tables come from the font when it has them (fontconv emits
+    # both). Otherwise advances are read once here and ink widths, which
+    # need a scan of the glyph, on first use; 0 marks one not yet scanned.
+    def _widths(self, font):
+        w = Writer.widths.get(font)
+        if w is None:
+            w = font.widths() if hasattr(font, "widths") else None
+            if w is None:
+                first = font.min_ch() if hasattr(font, "min_ch") else 32
+                last = font.max_ch() if hasattr(font, "max_ch") else 126
+                adv = bytearray(font.get_ch(chr(n))[2] for n in range(first, last + 1))
+                w = (first, adv, bytearray(len(adv)))
+            Writer.widths[font] = w
+        return w
+
+    def _charwidth(self, char):
+        i = ord(char) - self._first
+        if 0 <= i < len(self._adv):
+            return self._adv[i]
+        return self.font.get_ch(char)[2]
+
     def _newline(self):
         s = self._getstate()
         height = self.font.height()
+        if self.hw_scroll and not self.row_clip:
+            self._hw_newline(s, height)
+            return
         s.text_row += height
         s.text_col = 0
         margin = self.screenheight - (s.text_row + height)
@@ -112,6 +206,41 @@ class Writer:
                 self.device.fill_rect(0, y, self.screenwidth, abs(margin), self.bgcolor)
                 s.text_row += margin
 
+    # Frame memory is used as a ring of text lines: text_row is a memory row
+    # and the panel shows memory row s.vssa at the top. When the new line
+    # would land on the oldest one on screen, that line is cleared and the
+    # scroll start moves one line down, so only the new line is redrawn.
+    def _hw_newline(self, s, height):
+        s.text_row = (s.text_row + height) % self.screenheight
+        s.text_col = 0
+        if s.text_row == s.vssa:
+            s.vssa = (s.vssa + height) % self.screenheight
+            self.device.fill_rect(0, s.text_row, self.screenwidth, height, self.bgcolor)
+            self.device.vscsad(s.vssa)
+
+    def set_hwscroll(self, value=None):
+        # Device must provide vscrdef() and vscsad(), and the screen must hold
+        # a whole number of text lines. The panel scrolls along its gate
+        # lines, which is sideways on screen when the memory access control
+        # byte swaps rows and columns (MADCTL MV, 0x20), as LCD_1inch3's
+        # default 0x70 does: construct it with a portrait value such as
+        # madctl=0x00. ST77xx also has vscrdef() and vscsad() but is no
+        # FrameBuffer, so Writer never reaches here with one.
+        if value is not None:
+            if value:
+                if not hasattr(self.device, "vscsad"):
+                    raise OSError("Device does not support hardware scrolling.")
+                if getattr(self.device, "madctl", 0) & 0x20:
+                    raise ValueError("Hardware scrolling needs a madctl without MV (0x20).")
+                if self.screenheight % self.font.height():
+                    raise ValueError("Screen height must be a multiple of font height.")
+                s = self._getstate()
+                s.vssa = 0
+                self.device.vscrdef()
+                self.device.vscsad(0)
+            self.hw_scroll = value
+        return self.hw_scroll
+
     def set_clip(self, row_clip=None, col_clip=None, wrap=None):
         if row_clip is not None:
             self.row_clip = row_clip
@@ -136,36 +265,150 @@ class Writer:
                 self._printchar("\n")
 
     def _printline(self, string, invert):
-        rstr = None
-        if self.wrap and self.stringlen(string, True):  # Length > self.screenwidth
-            pos = 0
-            lstr = string[:]
-            while self.stringlen(lstr, True):  # Length > self.screenwidth
-                pos = lstr.rfind(" ")
-                lstr = lstr[:pos].rstrip()
-            if pos > 0:
-                rstr = string[pos + 1 :]
-                string = lstr
-
-        for char in string:
-            self._printchar(char, invert)
-        if rstr is not None:
-            self._printchar("\n")
-            self._printline(rstr, invert)  # Recurse
+        start = 0
+        if self.wrap:
+            for end, nxt in self.linebreaks(string, self._getstate().text_col):
+                self._printrun(string[start:end], invert)
+                self._printchar("\n")
+                start = nxt
+        self._printrun(string[start:] if start else string, invert)
+
+    # Word wrap in one pass. Return (end, next) for each line break: the line
+    # holds string[:end] after the previous break and the next line starts
+    # at next. The first line starts at column col, later ones at 0.
+    # A line breaks at the last whitespace run holding a space whose
+    # preceding text fits, and continues after the run's last space. Text
+    # fits when its advances up to the last char plus that char's ink width
+    # are within the screen. Text past a word that cannot be broken is left
+    # on its line, to be clipped.
+    def linebreaks(self, string, col=0):
+        breaks = []
+        wd = self.screenwidth
+        first = self._first
+        adv = self._adv
+        nchars = len(adv)
+        charwidth = self._charwidth
+        truelen = self._truelen
+        n = len(string)
+        start = 0
+        while True:
+            x = col
+            ws = -1  # Start of the current whitespace run
+            run = -1  # Start of the last run holding a space
+            k = start
+            while k < n:
+                c = string[k]
+                if c.isspace():
+                    if ws < 0:
+                        ws = k
+                    if c == " ":
+                        run = ws
+                else:
+                    ws = -1
+                i = ord(c) - first
+                w = adv[i] if 0 <= i < nchars else charwidth(c)
+                if x + w > wd and x + truelen(c) > wd:
+                    break  # Overflows at k
+                x += w
+                k += 1
+            if k == n:
+                return breaks
+            if ws >= 0 and run != ws:
+                q = k  # Overflowed in a run: it counts if a space follows
+                while q < n and string[q].isspace():
+                    if string[q] == " ":
+                        run = ws
+                        break
+                    q += 1
+            if run < 0:
+                return breaks
+            p = run
+            q = run
+            while q < n and string[q].isspace():
+                if string[q] == " ":
+                    p = q  # Last space of the run
+                q += 1
+            if p == start:
+                return breaks
+            breaks.append((run, p + 1))
+            start = p + 1
+            col = 0
+
+    # Print runs of glyphs that fit on the current row with one device blit
+    # each. Tabs and glyphs that do not fit go through _printchar, which
+    # handles tab stops, clipping and line breaks.
+    def _printrun(self, string, invert):
+        s = self._getstate()
+        first = self._first
+        adv = self._adv
+        nchars = len(adv)
+        charwidth = self._charwidth
+        height = self.font.height()
+        wd = self.screenwidth
+        n = len(string)
+        i = 0
+        while i < n:
+            col = s.text_col
+            j = i
+            while j < n and string[j] != "\t":
+                c = string[j]
+                k = ord(c) - first
+                char_width = adv[k] if 0 <= k < nchars else charwidth(c)
+                if col + char_width > wd:
+                    break
+                col += char_width
+                j += 1
+            if j == i:
+                self._printchar(string[i], invert)
+                i += 1
+                continue
+            if s.text_row + height > self.screenheight:
+                if self.row_clip:
+                    return
+                self._newline()
+                continue  # Row is now empty, so measure again
+            self._blitline(self._compose(string, i, j, col - s.text_col, invert),
+                           s.text_col, s.text_row, invert)
+            s.text_col = col
+            self.cpos += j - i
+            i = j
+
+    # Render string[i:j] into the line buffer, which holds one text row of
+    # the screen width and is reused by every line.
+    def _compose(self, string, i, j, width, invert):
+        height = self.font.height()
+        size = ((self.screenwidth * self._bpp + 7) >> 3) * height
+        if self._linebuf is None or len(self._linebuf) < size:
+            self._linebuf = bytearray(size)
+        line = _Glyph(self._linebuf, width, height, self.map)
+        font = self.font
+        glyph = self._glyph
+        x = 0
+        for k in range(i, j):
+            fbc = glyph(font, string[k], invert)
+            line.blit(fbc, x, 0)
+            x += fbc.width
+        return line
+
+    def _glyph(self, font, char, invert):
+        return Writer.glyphs.get(font, char, invert, self.map)
+
+    def _blitline(self, line, x, y, invert):
+        self.device.blit(line, x, y)
 
     def stringlen(self, string, oh=False):
         if not len(string):
             return 0
         sc = self._getstate().text_col  # Start column
         wd = self.screenwidth
+        charwidth = self._charwidth
         l = 0
-        for char in string[:-1]:
-            _, _, char_width = self.font.get_ch(char)
-            l += char_width
+        for i in range(len(string) - 1):
+            l += charwidth(string[i])
             if oh and l + sc > wd:
                 return True  # All done. Save time.
         char = string[-1]
-        _, _, char_width = self.font.get_ch(char)
+        char_width = charwidth(char)
         if oh and l + sc + char_width > wd:
             l += self._truelen(char)  # Last char might have blank cols on RHS
         else:
@@ -174,25 +417,16 @@ class Writer:
 
     # Return the printable width of a glyph less any blank columns on RHS
     def _truelen(self, char):
+        i = ord(char) - self._first
+        ink = self._ink
+        if 0 <= i < len(ink):
+            w = ink[i]
+            if not w:
+                glyph, ht, wd = self.font.get_ch(char)
+                w = ink[i] = _inkwidth(glyph, ht, wd, self.map)
+            return w
         glyph, ht, wd = self.font.get_ch(char)
-        div, mod = divmod(wd, 8)
-        gbytes = div + 1 if mod else div  # No. of bytes per row of glyph
-        mc = 0  # Max non-blank column
-        data = glyph[(wd - 1) // 8]  # Last byte of row 0
-        for row in range(ht):  # Glyph row
-            for col in range(wd - 1, -1, -1):  # Glyph column
-                gbyte, gbit = divmod(col, 8)
-                if gbit == 0:  # Next glyph byte
-                    data = glyph[row * gbytes + gbyte]
-                if col <= mc:
-                    break
-                if data & (1 << (7 - gbit)):  # Pixel is lit (1)
-                    mc = col  # Eventually gives rightmost lit pixel
-                    break
-            if mc + 1 == wd:
-                break  # All done: no trailing space
-        # print('Truelen', char, wd, mc + 1)  # TEST
-        return mc + 1
+        return _inkwidth(glyph, ht, wd, self.map)
 
     def _get_char(self, char, recurse):
         if not recurse:  # Handle tabs
@@ -234,15 +468,15 @@ class Writer:
         self._get_char(char, recurse)
         if self.glyph is None:
             return  # All done
-        buf = bytearray(self.glyph)
-        if invert:
-            for i, v in enumerate(buf):
-                buf[i] = 0xFF & ~v
-        fbc = framebuf.FrameBuffer(buf, self.char_width, self.char_height, self.map)
-        self.device.blit(fbc, s.text_col, s.text_row)
+        self._blitline(self._glyph(self.font, char, invert), s.text_col, s.text_row, invert)
         s.text_col += self.char_width
         self.cpos += 1
 
+    def preload(self, chars, invert=False):
+        """Build the cached glyphs for chars ahead of rendering."""
+        for char in chars:
+            self._glyph(self.font, char, invert)
+
     def tabsize(self, value=None):
         if value is not None:
             self.tab = value
@@ -253,7 +487,11 @@ class Writer:
 
 
 # Writer for colour displays.
+# Anti-aliased fonts are blended through a palette from the device's
+# blend_palette(fg, bg, levels).
 class CWriter(Writer):
+    _blend = True
+
     @staticmethod
     def create_color(ssd, idx, r, g, b):
         c = ssd.rgb(r, g, b)
@@ -271,6 +509,8 @@ class CWriter(Writer):
             raise OSError("Incompatible device driver.")
 
         super().__init__(device, font, verbose)
+        if self._bpp > 1 and not hasattr(device, "blend_palette"):
+            raise OSError("Device driver cannot blend anti-aliased fonts.")
         if bgcolor is not None:  # Assume monochrome.
             self.bgcolor = bgcolor
         if fgcolor is not None:
@@ -278,19 +518,19 @@ class CWriter(Writer):
         self.def_bgcolor = self.bgcolor
         self.def_fgcolor = self.fgcolor
 
-    def _printchar(self, char, invert=False, recurse=False):
-        s = self._getstate()
-        self._get_char(char, recurse)
-        if self.glyph is None:
-            return  # All done
-        buf = bytearray_at(addressof(self.glyph), len(self.glyph))
-        fbc = framebuf.FrameBuffer(buf, self.char_width, self.char_height, self.map)
-        palette = self.device.palette
-        palette.bg(self.fgcolor if invert else self.bgcolor)
-        palette.fg(self.bgcolor if invert else self.fgcolor)
-        self.device.blit(fbc, s.text_col, s.text_row, -1, palette)
-        s.text_col += self.char_width
-        self.cpos += 1
+    # Colors, and so inversion, come from the palette at blit time
+    def _glyph(self, font, char, invert):
+        return Writer.glyphs.get(font, char, False, self.map)
+
+    def _blitline(self, line, x, y, invert):
+        fg, bg = (self.bgcolor, self.fgcolor) if invert else (self.fgcolor, self.bgcolor)
+        if self._bpp > 1:
+            palette = self.device.blend_palette(fg, bg, 1 << self._bpp)
+        else:
+            palette = self.device.palette
+            palette.bg(bg)
+            palette.fg(fg)
+        self.device.blit(line, x, y, -1, palette)
 
     def setcolor(self, fgcolor=None, bgcolor=None):
         if fgcolor is None and bgcolor is None:
@@ -1,6 +1,9 @@
 from machine import Pin, SPI, PWM
 import time
 from lcd import LCD_1inch3
+from assetpack import AssetPack
+from imgcache import ImageCache
+from jpeg import JPEG
 import game
 
 # ========== SPI and Backlight ==========
@@ -37,6 +40,18 @@ menu_items = [
 ]
 selected_index = 0
 
+# Icons come from one pack when present (tools/packassets.py icons)
+try:
+    icons = AssetPack("icons.pak")
+except OSError:
+    icons = None
+# All nine 80x80 icons take 115 KB, more than the heap can spare next to the
+# frame, so the full menu is drawn from flash and only cursor moves use the
+# cache. The selected cell's icon is loaded when the cell is selected, so
+# repairing its outline on the move away always hits. Two icons fit, which
+# also keeps the previous cell's for moving straight back.
+icon_cache = ImageCache(2 * 80 * 80 * 2, pack=icons)
+
 # ========== Joystick & Button Setup ==========
 keyA = Pin(15, Pin.IN, Pin.PULL_UP)
 keyB = Pin(17, Pin.IN, Pin.PULL_UP)
@@ -49,23 +64,77 @@ right = Pin(20, Pin.IN, Pin.PULL_UP)
 ctrl  = Pin(3, Pin.IN, Pin.PULL_UP)
 
 # ========== Menu Drawing ==========
+def icon_key(i):
+    path = menu_items[i]["icon"]
+    name = path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    if icons is not None and name in icons:
+        return name
+    return path
+
+def draw_icon(i, x, y, clip):
+    if i == selected_index:
+        icon_cache.draw(LCD, icon_key(i), x, y, clip)
+    else:
+        icon_cache.stream(LCD, icon_key(i), x, y, clip)
+
+def load_icon(i):
+    # Cache the icon clear_outline(i) will need once the cursor leaves i
+    try:
+        icon_cache.get(icon_key(i))
+    except (OSError, ValueError):
+        pass  # No icon: draw_cell() shows a placeholder
+
+def draw_cell(i):
+    item = menu_items[i]
+    row = i // 3
+    col = i % 3
+    x = col * 80
+    y = row * 80
+    LCD.fill_rect(x, y, 80, 80, LCD.white)
+    try:
+        draw_icon(i, x, y, (x, y, 80, 80))
+    except Exception:
+        LCD.rect(x + 10, y + 10, 60, 60, LCD.red)
+        LCD.text("?", x + 30, y + 30, LCD.red)
+    if i == selected_index:
+        LCD.rect(x, y, 80, 80, LCD.red)
+    LCD.text(item["label"], x + 10, y + 65, LCD.blue)
+
+def clear_outline(i):
+    # Put back the icon pixels under the selection outline only
+    x = i % 3 * 80
+    y = i // 3 * 80
+    LCD.rect(x, y, 80, 80, LCD.white)
+    try:
+        for clip in ((x, y, 80, 1), (x, y + 79, 80, 1), (x, y + 1, 1, 78), (x + 79, y + 1, 1, 78)):
+            icon_cache.draw(LCD, icon_key(i), x, y, clip)
+    except (OSError, ValueError):
+        pass  # No icon: the white outline is what draw_cell() shows
+
+def show_photo():
+    # image.jpg, decoded at the first scale that fits the screen
+    with open("image.jpg", "rb") as f:
+        for scale in (1, 2, 4, 8):
+            f.seek(0)
+            photo = JPEG(f, scale)
+            if photo.width <= LCD.width and photo.height <= LCD.height:
+                break
+        LCD.fill(LCD.white)
+        photo.draw(LCD, (LCD.width - photo.width) // 2, (LCD.height - photo.height) // 2)
+
 def draw_3x3_menu():
     LCD.fill(LCD.white)
-    for i, item in enumerate(menu_items):
-        row = i // 3
-        col = i % 3
-        x = col * 80
-        y = row * 80
-        try:
-            LCD.blit_raw_image(item["icon"], x, y)
-        except Exception:
-            LCD.rect(x + 10, y + 10, 60, 60, LCD.red)
-            LCD.text("?", x + 30, y + 30, LCD.red)
-        if i == selected_index:
-            LCD.rect(x, y, 80, 80, LCD.red)
-        LCD.text(item["label"], x + 10, y + 65, LCD.blue)
+    for i in range(len(menu_items)):
+        draw_cell(i)
     LCD.show()
 
+def move_selection(previous):
+    # Only the outlines of the two affected cells are redrawn and sent
+    clear_outline(previous)
+    LCD.rect(selected_index % 3 * 80, selected_index // 3 * 80, 80, 80, LCD.red)
+    LCD.show()
+    load_icon(selected_index)
+
 # ========== Main Loop ==========
 last_up = last_down = last_left = last_right = last_ctrl = 1
 draw_3x3_menu()
@@ -78,6 +147,7 @@ while True:
     current_ctrl = ctrl.value()
 
     moved = False
+    previous_index = selected_index
 
     if current_up == 0 and last_up == 1:
         if selected_index >= 3:
@@ -97,7 +167,7 @@ while True:
             moved = True
 
     if moved:
-        draw_3x3_menu()
+        move_selection(previous_index)
 
     if current_ctrl == 0 and last_ctrl == 1:
         selected_item = menu_items[selected_index]["label"]
@@ -113,16 +183,16 @@ while True:
             LCD.show()
             time.sleep(1.5)
         elif selected_item == "Obstacle":
-            game.start()
+            game.start(LCD)
             time.sleep(1.5)
         elif selected_item == "Clear":
             LCD.fill(LCD.white)
             LCD.show()
         elif selected_item == "Image":
             try:
+                show_photo()
+            except (OSError, ValueError):
                 LCD.blit_raw_image("image.raw")
-            except Exception:
-                LCD.text("image.raw not found", 10, 100, LCD.red)
             LCD.show()
             time.sleep(2)
         elif selected_item == "Exit":
@@ -46,6 +46,8 @@ html = """
 import network, socket, time, os
 from machine import Pin, PWM, SPI
 import framebuf
+from lcdbus import LCDBus, INIT_1INCH3
+from bmp import BMP
 
 # Configure WiFi
 ssid = 'Airtel_Home'
@@ -69,80 +71,25 @@ class LCD_1inch3(framebuf.FrameBuffer):
         self.rst = Pin(12, Pin.OUT)
         self.dc = Pin(8, Pin.OUT)
         self.spi = SPI(1, baudrate=100000000, polarity=0, phase=0, sck=Pin(10), mosi=Pin(11))
+        self.bus = LCDBus(self.spi, self.cs, self.dc, self.rst)
         self.buffer = bytearray(self.height * self.width * 2)
         super().__init__(self.buffer, self.width, self.height, framebuf.RGB565)
         self.init_display()
 
-    def write_cmd(self, cmd):
-        self.cs(1)
-        self.dc(0)
-        self.cs(0)
-        self.spi.write(bytearray([cmd]))
-        self.cs(1)
-
-    def write_data(self, data):
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(bytearray([data]))
-        self.cs(1)
-
     def init_display(self):
-        self.rst(1)
-        self.rst(0)
-        self.rst(1)
-        for cmd, val in [
-            (0x36, 0x70), (0x3A, 0x05), (0xB2, [0x0C, 0x0C, 0x00, 0x33, 0x33]),
-            (0xB7, 0x35), (0xBB, 0x19), (0xC0, 0x2C), (0xC2, 0x01),
-            (0xC3, 0x12), (0xC4, 0x20), (0xC6, 0x0F),
-            (0xD0, [0xA4, 0xA1]), (0xE0, [0xD0, 0x04, 0x0D, 0x11, 0x13, 0x2B, 0x3F, 0x54, 0x4C, 0x18, 0x0D, 0x0B, 0x1F, 0x23]),
-            (0xE1, [0xD0, 0x04, 0x0C, 0x11, 0x13, 0x2C, 0x3F, 0x44, 0x51, 0x2F, 0x1F, 0x1F, 0x20, 0x23])
-        ]:
-            self.write_cmd(cmd)
-            if isinstance(val, list):
-                for d in val: self.write_data(d)
-            else:
-                self.write_data(val)
-        self.write_cmd(0x21)
-        self.write_cmd(0x11)
-        self.write_cmd(0x29)
+        self.bus.reset()
+        self.bus.run(INIT_1INCH3)
 
     def show(self):
-        self.write_cmd(0x2A)
-        for d in [0x00, 0x00, 0x00, 0xef]: self.write_data(d)
-        self.write_cmd(0x2B)
-        for d in [0x00, 0x00, 0x00, 0xef]: self.write_data(d)
-        self.write_cmd(0x2C)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
-        self.spi.write(self.buffer)
-        self.cs(1)
+        self.bus.blit(0, 0, self.width - 1, self.height - 1, self.buffer)
 
     def display_bmp(self, path):
-        with open(path, "rb") as f:
-            bmp = f.read()
-            if bmp[0:2] != b"BM":
-                print("Not BMP")
-                return
-            offset = int.from_bytes(bmp[10:14], "little")
-            width = int.from_bytes(bmp[18:22], "little")
-            height = int.from_bytes(bmp[22:26], "little")
-            bpp = int.from_bytes(bmp[28:30], "little")
-            if width != 240 or height != 240 or bpp != 24:
-                print("Invalid size or depth")
-                return
-            pixel_data = bmp[offset:]
-            i = 0
-            for y in range(240):
-                for x in range(240):
-                    b = pixel_data[i]
-                    g = pixel_data[i+1]
-                    r = pixel_data[i+2]
-                    color = ((r & 0xf8) << 8) | ((g & 0xfc) << 3) | (b >> 3)
-                    self.pixel(x, 239 - y, color)
-                    i += 3
-            self.show()
+        # Streamed band by band straight to the panel, any size
+        try:
+            with open(path, "rb") as f:
+                BMP(f).draw(self, 0, 0, direct=True)
+        except ValueError as e:
+            print(e)
 
 LCD = LCD_1inch3()
 
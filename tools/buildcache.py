@@ -0,0 +1,58 @@
+# buildcache.py Content-hashed build cache for the asset tools (host side).
+#
+# A conversion is keyed on the SHA-256 of its source file together with the
+# parameters used. When the key is unchanged and every recorded output is
+# still on disk with the recorded hash, the conversion is skipped.
+
+import hashlib
+import json
+import os
+
+VERSION = 1  # Bump when the tools change their output for the same input
+
+
+def data_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class BuildCache:
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def key(source, params):
+        """Hash of the source content and the conversion parameters."""
+        h = hashlib.sha256(file_hash(source).encode())
+        h.update(json.dumps([VERSION, params], sort_keys=True).encode())
+        return h.hexdigest()
+
+    def lookup(self, source, key, outdir):
+        """Return the manifest entries of an up-to-date build of source, or None."""
+        e = self._entries.get(source)
+        if e is None or e["key"] != key:
+            return None
+        for out in e["outputs"]:
+            path = os.path.join(outdir, out["output"])
+            if not os.path.exists(path) or file_hash(path) != out["sha256"]:
+                return None
+        return e["outputs"]
+
+    def store(self, source, key, outputs):
+        self._entries[source] = {"key": key, "outputs": outputs}
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
@@ -0,0 +1,55 @@
+# changed.py List build outputs that differ from what was last deployed.
+#
+# python tools/changed.py build/manifest.json icons.pak
+# python tools/changed.py build/manifest.json icons.pak --mark
+#
+# Arguments are imgconv manifests, whose entries carry output hashes, or
+# plain files such as packs, which are hashed here. Changed files are
+# printed one per line for the copy step (e.g. mpremote cp); --mark records
+# the current hashes as deployed once the copy succeeded.
+
+import argparse
+import json
+import os
+
+from buildcache import file_hash
+
+
+def current(paths):
+    """Return {file path: sha256} for manifests and plain files."""
+    hashes = {}
+    for p in paths:
+        if p.endswith(".json"):
+            base = os.path.dirname(p)
+            with open(p) as f:
+                for e in json.load(f):
+                    hashes[os.path.join(base, e["output"])] = e["sha256"]
+        else:
+            hashes[p] = file_hash(p)
+    return hashes
+
+
+def main():
+    ap = argparse.ArgumentParser(description="List outputs changed since the last deploy.")
+    ap.add_argument("paths", nargs="+", help="manifest.json files or plain files")
+    ap.add_argument("--state", default=".deployed.json", help="record of deployed hashes")
+    ap.add_argument("--mark", action="store_true", help="record the current hashes as deployed")
+    args = ap.parse_args()
+    try:
+        with open(args.state) as f:
+            deployed = json.load(f)
+    except (OSError, ValueError):
+        deployed = {}
+    hashes = current(args.paths)
+    if args.mark:
+        deployed.update(hashes)
+        with open(args.state, "w") as f:
+            json.dump(deployed, f, indent=1, sort_keys=True)
+        return
+    for path, h in sorted(hashes.items()):
+        if deployed.get(path) != h:
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
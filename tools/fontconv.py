@@ -0,0 +1,192 @@
+# fontconv.py Build a BinFont module from a dict font or a TrueType font
+# (host side).
+#
+# python tools/fontconv.py font8x8_basic.py -o lib/font8x8.py
+# python tools/fontconv.py FreeSans.ttf --size 20 --bpp 4 -o lib/freesans20aa.py
+#
+# A dict source module holds font = {char: [row, ...]} with one byte per row
+# of an 8 pixel wide glyph, bit 0 leftmost as in font8x8_basic (--msb if bit
+# 7 is leftmost). A .ttf or .otf source is rendered with Pillow at --size
+# pixels, with 1, 2 or 4 bits of coverage per pixel (--bpp); 2 and 4 give
+# anti-aliased fonts for CWriter and ST7789.text().
+#
+# The output is a Python module with the glyphs as a bytes literal in the
+# font-to-py layout and module-level functions wrapping a binfont.BinFont,
+# so it can be frozen and passed anywhere a font-to-py font is accepted.
+# Missing lower case letters use the upper case glyph, other missing
+# characters the --default one, and identical glyphs are stored once.
+# Advance and ink width tables are emitted alongside for Writer's wrapping.
+
+import argparse
+import os
+import struct
+
+_FUNCS = ("height", "max_width", "hmap", "reverse", "monospaced", "min_ch", "max_ch",
+          "bpp", "widths", "get_ch")
+
+
+def load_dict(path):
+    """Return the font dict defined by the module at path."""
+    scope = {}
+    with open(path) as f:
+        exec(compile(f.read(), path, "exec"), scope)
+    return scope["font"]
+
+
+def _reverse_bits(b):
+    return int("{:08b}".format(b)[::-1], 2)
+
+
+def dict_glyphs(font, width, height, msb=False):
+    """Return {char: (width, rows)} for a dict font."""
+    size = (width + 7) // 8 * height
+    glyphs = {}
+    for ch, rows in font.items():
+        if len(rows) != size:
+            raise ValueError("{!r}: {} bytes, expected {}".format(ch, len(rows), size))
+        glyphs[ch] = (width, bytes(rows if msb else (_reverse_bits(b) for b in rows)))
+    return glyphs
+
+
+def _pack(levels, width, bpp):
+    """Pack one row of coverage levels the way framebuf reads it."""
+    out = bytearray((width * bpp + 7) // 8)
+    for x, v in enumerate(levels):
+        if bpp == 1:
+            out[x >> 3] |= v << (7 - (x & 7))  # MONO_HLSB: leftmost in bit 7
+        elif bpp == 2:
+            out[x >> 2] |= v << ((x & 3) << 1)  # GS2_HMSB: leftmost in bits 0-1
+        else:
+            out[x >> 1] |= v << (0 if x & 1 else 4)  # GS4_HMSB: leftmost high
+    return bytes(out)
+
+
+def _level(rows, rowbytes, x, y, bpp):
+    b = rows[y * rowbytes + (x * bpp >> 3)]
+    if bpp == 1:
+        return b >> (7 - (x & 7)) & 1
+    if bpp == 2:
+        return b >> ((x & 3) << 1) & 3
+    return b >> (0 if x & 1 else 4) & 15
+
+
+def ink_width(width, height, rows, bpp=1):
+    """Width less any blank columns on the right, at least 1."""
+    rowbytes = (width * bpp + 7) // 8
+    for x in range(width - 1, 0, -1):
+        if any(_level(rows, rowbytes, x, y, bpp) for y in range(height)):
+            return x + 1
+    return 1
+
+
+def ttf_glyphs(path, size, first=32, last=126, bpp=1):
+    """Render chars first..last of a TrueType font.
+
+    Return ({char: (width, rows)}, height). Widths are the advances, so
+    glyphs are placed side by side; ink outside the advance is clipped.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.truetype(path, size)
+    ascent, descent = font.getmetrics()
+    height = ascent + descent
+    top = (1 << bpp) - 1
+    glyphs = {}
+    for n in range(first, last + 1):
+        ch = chr(n)
+        width = max(1, round(font.getlength(ch)))
+        img = Image.new("L", (width, height))
+        ImageDraw.Draw(img).text((0, 0), ch, font=font, fill=255)
+        px = img.tobytes()
+        rows = b"".join(
+            _pack([(v * top + 127) // 255 for v in px[y * width:(y + 1) * width]], width, bpp)
+            for y in range(height))
+        glyphs[ch] = (width, rows)
+    return glyphs, height
+
+
+def build(glyphs, height, first=32, last=126, default=" ", bpp=1):
+    """Return (data, index, advances, ink widths) for chars first..last of
+    {char: (width, rows)}."""
+    data = bytearray()
+    index = bytearray()
+    advance = bytearray()
+    ink = bytearray()
+    seen = {}
+    for n in range(first, last + 1):
+        ch = chr(n)
+        width, rows = glyphs.get(ch) or glyphs.get(ch.upper()) or glyphs[default]
+        advance.append(width)
+        ink.append(ink_width(width, height, rows, bpp))
+        glyph = struct.pack("<H", width) + rows
+        start = seen.get(glyph)
+        if start is None:
+            start = seen[glyph] = len(data)
+            data += glyph
+        index += struct.pack("<HH", start, start + len(glyph))
+    return bytes(data), bytes(index), bytes(advance), bytes(ink)
+
+
+def _literal(name, data):
+    lines = ["{} =\\".format(name)]
+    for i in range(0, len(data), 16):
+        lines.append("b'" + "".join("\\x{:02x}".format(b) for b in data[i:i + 16]) + "'\\")
+    lines[-1] = lines[-1][:-1]
+    return "\n".join(lines) + "\n"
+
+
+def module_source(source, data, index, advance, ink, width, height, first, last,
+                  default, monospaced=True, bpp=1):
+    out = [
+        "# Code generated by fontconv.py.",
+        "# Font: {}".format(source),
+        "",
+        "from binfont import BinFont",
+        "",
+        _literal("_font", data),
+        _literal("_index", index),
+        _literal("_advance", advance),
+        _literal("_ink", ink),
+        "_f = BinFont(_font, _index, {}, {}, {}, {}, {}, {}, {}, (_advance, _ink))".format(
+            height, width, first, last, ord(default), monospaced, bpp),
+        "",
+    ]
+    out += ["{0} = _f.{0}".format(name) for name in _FUNCS]
+    return "\n".join(out) + "\n"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build a BinFont module from a dict or TrueType font.")
+    ap.add_argument("source")
+    ap.add_argument("-o", "--output", required=True)
+    ap.add_argument("--width", type=int, default=8, help="dict font glyph width")
+    ap.add_argument("--height", type=int, default=8, help="dict font glyph height")
+    ap.add_argument("--size", type=int, default=20, help="TrueType font height in pixels")
+    ap.add_argument("--bpp", type=int, default=1, choices=(1, 2, 4),
+                    help="TrueType coverage bits per pixel")
+    ap.add_argument("--first", type=int, default=32)
+    ap.add_argument("--last", type=int, default=126)
+    ap.add_argument("--default", default=" ", help="glyph for missing characters")
+    ap.add_argument("--msb", action="store_true", help="bit 7 of each row is leftmost")
+    args = ap.parse_args()
+    if os.path.splitext(args.source)[1].lower() in (".ttf", ".otf"):
+        glyphs, height = ttf_glyphs(args.source, args.size, args.first, args.last, args.bpp)
+        bpp = args.bpp
+        monospaced = len(set(w for w, _ in glyphs.values())) == 1
+    else:
+        glyphs = dict_glyphs(load_dict(args.source), args.width, args.height, args.msb)
+        height = args.height
+        bpp = 1
+        monospaced = True
+    data, index, advance, ink = build(glyphs, height, args.first, args.last, args.default, bpp)
+    width = max(w for w, _ in glyphs.values())
+    src = module_source(os.path.basename(args.source), data, index, advance, ink, width,
+                        height, args.first, args.last, args.default, monospaced, bpp)
+    with open(args.output, "w") as f:
+        f.write(src)
+    print("{}: {} glyphs, {} bytes".format(args.output, args.last - args.first + 1,
+                                           len(data) + len(index) + len(advance) + len(ink)))
+
+
+if __name__ == "__main__":
+    main()
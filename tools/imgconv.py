@@ -0,0 +1,187 @@
+# imgconv.py Convert images to display assets (host side).
+#
+# python tools/imgconv.py icons -o build --size 80x80 --fit fit --format rle
+# python tools/imgconv.py old_code/settings.jpg -o . --size 240x240
+#
+# Sources are image files or directories of them. Pixels are converted as
+# whole NumPy arrays. Formats:
+#   raw      big-endian RGB565, as the panel reads it (.raw)
+#   raw-le   little-endian RGB565, for framebuf.RGB565 buffers (.raw)
+#   rle      RLE565, see lib/rle565.py (.rle)
+#   palette  up to 16 (GS4_HMSB, left pixel in the high nibble) or 256
+#            (GS8) indices (.idx) plus big-endian RGB565 entries (.pal)
+#   mask     1 bit per pixel, MONO_HLSB rows padded to bytes (.mask)
+# Resizing: stretch to --size, fit inside it (padded with --bg) or fill it
+# (center-cropped). A manifest.json describing the outputs, with their
+# SHA-256, is written to the output directory for tools/changed.py.
+#
+# Builds are incremental: sources whose content and parameters match the
+# last build, and whose outputs are intact, are skipped (see buildcache.py).
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+import rle565
+from buildcache import BuildCache, data_hash
+
+_IMAGE_EXT = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+# 4x4 ordered dither thresholds in [0, 1)
+_BAYER4 = np.array([[0, 8, 2, 10],
+                    [12, 4, 14, 6],
+                    [3, 11, 1, 9],
+                    [15, 7, 13, 5]], dtype=np.float32) / 16
+
+
+def resize(img, size, fit="stretch", bg=(255, 255, 255)):
+    """Scale img to size (w, h): stretch, fit inside (padded) or fill (cropped)."""
+    if size is None or img.size == size:
+        return img
+    w, h = size
+    if fit == "stretch":
+        return img.resize(size, Image.LANCZOS)
+    sw, sh = img.size
+    scale = (min if fit == "fit" else max)(w / sw, h / sh)
+    nw = max(1, round(sw * scale))
+    nh = max(1, round(sh * scale))
+    img = img.resize((nw, nh), Image.LANCZOS)
+    out = Image.new(img.mode, size, bg + (255,) * (img.mode == "RGBA"))
+    out.paste(img, ((w - nw) // 2, (h - nh) // 2))
+    return out
+
+
+def _bayer(h, w):
+    reps = (h + 3) // 4, (w + 3) // 4
+    return np.tile(_BAYER4, reps)[:h, :w]
+
+
+def to_rgb565(rgb, dither=False):
+    """Return an (h, w) uint16 array of RGB565 values for uint8 rgb."""
+    rgb = rgb.astype(np.float32)
+    if dither:
+        # Offset each channel by up to one quantization step before truncating
+        t = _bayer(*rgb.shape[:2])[..., None]
+        rgb = rgb + t * np.array([8, 4, 8], dtype=np.float32)
+    rgb = np.clip(rgb, 0, 255).astype(np.uint16)
+    return (rgb[..., 0] >> 3) << 11 | (rgb[..., 1] >> 2) << 5 | rgb[..., 2] >> 3
+
+
+def to_mask(img, threshold=128, dither=False):
+    """Return MONO_HLSB bytes: alpha if present, else luminance, thresholded."""
+    if img.mode == "RGBA":
+        v = np.asarray(img)[..., 3].astype(np.float32)
+    else:
+        v = np.asarray(img.convert("L")).astype(np.float32)
+    if dither:
+        v = v + (_bayer(*v.shape) - 0.5) * 255
+    return np.packbits(v >= threshold, axis=1).tobytes()
+
+
+def to_palette(img, colors=16, dither=False):
+    """Return (index bytes, palette bytes) for an image of at most 256 colors."""
+    q = img.convert("RGB").quantize(
+        colors=colors, dither=Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE)
+    idx = np.asarray(q, dtype=np.uint8)
+    pal = np.array(q.getpalette()[:3 * colors], dtype=np.uint8).reshape(-1, 3)
+    pal565 = to_rgb565(pal[None])[0].astype(">u2").tobytes()
+    if colors <= 16:
+        if idx.shape[1] & 1:
+            idx = np.pad(idx, ((0, 0), (0, 1)))
+        idx = idx[:, 0::2] << 4 | idx[:, 1::2]
+    return idx.tobytes(), pal565
+
+
+def convert(path, outdir, fmt="raw", size=None, fit="stretch", dither=False,
+            bg=(255, 255, 255), colors=16, threshold=128):
+    """Convert one image; returns its manifest entries."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    img = Image.open(path)
+    alpha = "A" in img.getbands() or "transparency" in img.info
+    img = img.convert("RGBA")
+    if not (fmt == "mask" and alpha):
+        # Flatten transparent areas onto the background color
+        img = Image.alpha_composite(Image.new("RGBA", img.size, bg + (255,)), img).convert("RGB")
+    img = resize(img, size, fit, bg)
+    w, h = img.size
+    outputs = []
+    if fmt == "mask":
+        outputs.append((name + ".mask", to_mask(img, threshold, dither)))
+    elif fmt == "palette":
+        idx, pal = to_palette(img, colors, dither)
+        outputs.append((name + ".idx", idx))
+        outputs.append((name + ".pal", pal))
+    else:
+        v = to_rgb565(np.asarray(img), dither)
+        if fmt == "raw-le":
+            outputs.append((name + ".raw", v.astype("<u2").tobytes()))
+        else:
+            data = v.astype(">u2").tobytes()
+            if fmt == "rle":
+                outputs.append((name + ".rle", rle565.encode(data, w, h)))
+            else:
+                outputs.append((name + ".raw", data))
+    entries = []
+    for fn, data in outputs:
+        with open(os.path.join(outdir, fn), "wb") as f:
+            f.write(data)
+        entries.append({"name": name, "source": path, "output": fn, "format": fmt,
+                        "width": w, "height": h, "bytes": len(data),
+                        "sha256": data_hash(data)})
+    return entries
+
+
+def sources(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            for fn in sorted(os.listdir(p)):
+                if os.path.splitext(fn)[1].lower() in _IMAGE_EXT:
+                    yield os.path.join(p, fn)
+        else:
+            yield p
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert images to display assets.")
+    ap.add_argument("sources", nargs="+", help="image files or directories")
+    ap.add_argument("-o", "--output", default=".", help="output directory")
+    ap.add_argument("--format", default="raw",
+                    choices=("raw", "raw-le", "rle", "palette", "mask"))
+    ap.add_argument("--size", help="WxH, e.g. 80x80")
+    ap.add_argument("--fit", default="stretch", choices=("stretch", "fit", "fill"))
+    ap.add_argument("--bg", default="ffffff", help="padding color for --fit fit")
+    ap.add_argument("--dither", action="store_true")
+    ap.add_argument("--colors", type=int, default=16, help="palette size (2-256)")
+    ap.add_argument("--threshold", type=int, default=128, help="mask threshold")
+    ap.add_argument("--force", action="store_true", help="rebuild everything")
+    args = ap.parse_args()
+    size = tuple(int(v) for v in args.size.split("x")) if args.size else None
+    bg = tuple(int(args.bg[i:i + 2], 16) for i in (0, 2, 4))
+    os.makedirs(args.output, exist_ok=True)
+    cache = BuildCache(os.path.join(args.output, ".imgconv-cache.json"))
+    params = [args.format, size, args.fit, args.dither, bg, args.colors, args.threshold]
+    manifest = []
+    for path in sources(args.sources):
+        key = cache.key(path, params)
+        entries = None if args.force else cache.lookup(path, key, args.output)
+        status = "cached"
+        if entries is None:
+            entries = convert(path, args.output, args.format, size, args.fit,
+                              args.dither, bg, args.colors, args.threshold)
+            cache.store(path, key, entries)
+            status = "built"
+        for e in entries:
+            print("{output:24} {width}x{height} {bytes} bytes ".format(**e) + status)
+        manifest.extend(entries)
+    cache.save()
+    with open(os.path.join(args.output, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# packassets.py Build an asset pack from a directory of images (host side).
+#
+# python tools/packassets.py icons -o icons.pak
+#
+# .raw files are big-endian RGB565 and taken to be square unless a size is
+# given, .rle files are RLE565 images. Other image files are converted with
+# Pillow, resized to --size when given. --rle stores RGB565 assets run-length
+# coded. Assets are named after the file without its extension.
+
+import argparse
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lib"))
+from assetpack import MAGIC, VERSION, HEADER, ENTRY, ALIGN, FMT_RGB565, FMT_RLE565
+import rle565
+from buildcache import file_hash, data_hash
+
+_IMAGE_EXT = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+
+def load_raw(path, size=None):
+    with open(path, "rb") as f:
+        data = f.read()
+    if size:
+        w, h = size
+    else:
+        w = h = int((len(data) // 2) ** 0.5)
+    if w * h * 2 != len(data):
+        raise ValueError("{}: {} bytes is not {}x{} RGB565".format(path, len(data), w, h))
+    return w, h, data
+
+
+def load_image(path, size=None):
+    import numpy as np
+    from PIL import Image
+    from imgconv import to_rgb565
+
+    img = Image.open(path).convert("RGB")
+    if size:
+        img = img.resize(size)
+    w, h = img.size
+    return w, h, to_rgb565(np.asarray(img)).astype(">u2").tobytes()
+
+
+def load_rle(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    _, w, h = struct.unpack_from(rle565.HEADER, data)
+    return w, h, data
+
+
+def collect(directory, size=None, rle=False):
+    """Return sorted (name, width, height, format, payload) tuples."""
+    assets = []
+    for fn in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(fn)
+        path = os.path.join(directory, fn)
+        ext = ext.lower()
+        if ext == ".rle":
+            w, h, data = load_rle(path)
+            assets.append((name, w, h, FMT_RLE565, data))
+            continue
+        if ext == ".raw":
+            w, h, data = load_raw(path, size)
+        elif ext in _IMAGE_EXT:
+            w, h, data = load_image(path, size)
+        else:
+            continue
+        if rle:
+            assets.append((name, w, h, FMT_RLE565, rle565.encode(data, w, h)))
+        else:
+            assets.append((name, w, h, FMT_RGB565, data))
+    return assets
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def pack(assets):
+    """Return the bytes of a pack holding assets."""
+    names = [a[0].encode() for a in assets]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate asset names")
+    offset = struct.calcsize(HEADER) + sum(struct.calcsize(ENTRY) + len(n) for n in names)
+    index = []
+    payload = []
+    for (_, w, h, fmt, data), name in zip(assets, names):
+        offset = _align(offset)
+        index.append(struct.pack(ENTRY, offset, len(data), w, h, fmt, len(name)) + name)
+        payload.append((offset, data))
+        offset += len(data)
+    out = bytearray(struct.pack(HEADER, MAGIC, VERSION, len(assets)) + b"".join(index))
+    for offset, data in payload:
+        out.extend(bytes(offset - len(out)))
+        out.extend(data)
+    return bytes(out)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build an asset pack from a directory of images.")
+    ap.add_argument("directory")
+    ap.add_argument("-o", "--output", default="icons.pak")
+    ap.add_argument("--size", help="WxH of the assets, e.g. 80x80")
+    ap.add_argument("--rle", action="store_true", help="run-length code RGB565 assets")
+    args = ap.parse_args()
+    size = tuple(int(v) for v in args.size.split("x")) if args.size else None
+    assets = collect(args.directory, size, args.rle)
+    data = pack(assets)
+    for name, w, h, _, payload in assets:
+        print("{:20} {}x{} {} bytes".format(name, w, h, len(payload)))
+    # Leave an identical pack alone, so deploys see it as unchanged
+    if os.path.exists(args.output) and file_hash(args.output) == data_hash(data):
+        print("{}: unchanged".format(args.output))
+        return
+    with open(args.output, "wb") as f:
+        f.write(data)
+    print("{}: {} assets, {} bytes".format(args.output, len(assets), len(data)))
+
+
+if __name__ == "__main__":
+    main()